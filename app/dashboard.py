@@ -22,7 +22,8 @@ from data.data_loader import (
     load_csv_data,
     load_manual_data,
     generate_mock_data,
-    compare_runs
+    compare_runs,
+    RunTable
 )
 
 app = Flask(__name__)
@@ -49,9 +50,9 @@ try:
         bots.append(bot)
 
     board = BoardRoom(bots)
-    logger.info(f"✓ Initialized {len(bots)} agents")
+    logger.info("✓ Initialized %s agents", len(bots))
 except Exception as e:
-    logger.error(f"Error initializing agents: {e}")
+    logger.error("Error initializing agents: %s", e)
     board = None
     bots = []
 
@@ -152,7 +153,7 @@ def api_runs():
             'data': formatted_runs
         })
     except Exception as e:
-        logger.error(f"Error fetching runs: {e}")
+        logger.error("Error fetching runs: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -184,7 +185,7 @@ def api_real_data():
             'data': formatted_runs
         })
     except Exception as e:
-        logger.error(f"Error fetching real data: {e}")
+        logger.error("Error fetching real data: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -212,7 +213,7 @@ def api_evaluate():
             'interaction': interaction
         })
     except Exception as e:
-        logger.error(f"Error evaluating run: {e}")
+        logger.error("Error evaluating run: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -229,18 +230,14 @@ def api_compare_real():
         if not real_runs:
             return jsonify({'success': False, 'message': 'No real data available'}), 200
         
-        best_real_profit = max(real_runs, key=lambda r: r.get('accumulated_profit', 0))
-        best_real_security = min(real_runs, key=lambda r: r.get('compromised_systems', float('inf')))
-        best_real_availability = max(real_runs, key=lambda r: r.get('systems_availability', 0))
-        
-        best_bot_profit = max(bot_runs, key=lambda r: r.get('accumulated_profit', 0))
-        best_bot_security = min(bot_runs, key=lambda r: r.get('compromised_systems', float('inf')))
-        best_bot_availability = max(bot_runs, key=lambda r: r.get('systems_availability', 0))
+        best_real_profit, best_real_security, best_real_availability = _best_runs(real_runs)
+        best_bot_profit, best_bot_security, best_bot_availability = _best_runs(bot_runs)
         
         real_avg = _calculate_average_run(real_runs)
         bot_avg = _calculate_average_run(bot_runs)
         
-        detailed_comparison = compare_runs(real_runs, bot_runs)
+        # Column-oriented tables let compare_runs aggregate each metric with NumPy
+        detailed_comparison = compare_runs(RunTable.from_records(real_runs), RunTable.from_records(bot_runs))
         
         return jsonify({
             'success': True,
@@ -284,7 +281,7 @@ def api_compare_real():
         })
     
     except Exception as e:
-        logger.error(f"Error in compare-real: {e}")
+        logger.error("Error in compare-real: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -309,7 +306,7 @@ def api_statistics():
             'data': stats
         })
     except Exception as e:
-        logger.error(f"Error calculating statistics: {e}")
+        logger.error("Error calculating statistics: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -385,7 +382,7 @@ def run_simulation():
             'results': sim_results
         }), 200
     except Exception as e:
-        logger.error(f"Error running simulation: {e}")
+        logger.error("Error running simulation: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -532,7 +529,7 @@ def run_multi_agent_simulation(scenario, collaboration, risk_tolerance, years):
         return sim_results
         
     except Exception as e:
-        logger.warning(f"Error running multi-agent simulation: {e}, using fallback")
+        logger.warning("Error running multi-agent simulation: %s, using fallback", e)
         return load_simulation_for_scenario(scenario, collaboration, risk_tolerance, years)
 
 
@@ -619,7 +616,7 @@ def load_simulation_for_scenario(scenario, collaboration, risk_tolerance, years)
             }
         }
     except Exception as e:
-        logger.warning(f"Could not load real simulation data: {e}, using mock data")
+        logger.warning("Could not load real simulation data: %s, using mock data", e)
         return generate_mock_simulation_results(scenario, collaboration, risk_tolerance, years)
 
 
@@ -684,7 +681,7 @@ def not_found(error):
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
-    logger.error(f"Internal server error: {error}")
+    logger.error("Internal server error: %s", error)
     return jsonify({
         'error': 'Internal server error',
         'status': 500,
@@ -697,24 +694,67 @@ def internal_error(error):
 # =====================
 
 
-def _calculate_average_run(runs: list) -> dict:
-    """Calculate average values across all runs."""
-    if not runs:
-        return {}
+def _accumulate_numeric_fields(runs: list, keep_values: bool = False) -> dict:
+    """
+    Single pass over runs accumulating count, sum, min and max per numeric field.
     
-    numeric_fields = {}
+    Returns {field: [count, total, min, max, values]} where values is only
+    collected when keep_values is set (needed for the median).
+    """
+    fields = {}
     for run in runs:
         for key, value in run.items():
-            if isinstance(value, (int, float)) and key not in ['id']:
-                if key not in numeric_fields:
-                    numeric_fields[key] = []
-                numeric_fields[key].append(value)
+            if key == 'id' or not isinstance(value, (int, float)):
+                continue
+            acc = fields.get(key)
+            if acc is None:
+                fields[key] = [1, value, value, value, [value] if keep_values else None]
+                continue
+            acc[0] += 1
+            acc[1] += value
+            if value < acc[2]:
+                acc[2] = value
+            if value > acc[3]:
+                acc[3] = value
+            if keep_values:
+                acc[4].append(value)
+    return fields
+
+
+def _best_runs(runs: list) -> tuple:
+    """
+    Single pass over runs picking the best profit, security and availability run.
+    
+    Ties keep the earliest run, matching max()/min() with a key.
+    """
+    best_profit = best_security = best_availability = runs[0]
+    top_profit = best_profit.get('accumulated_profit', 0)
+    low_compromised = best_security.get('compromised_systems', float('inf'))
+    top_availability = best_availability.get('systems_availability', 0)
     
-    avg_run = {}
-    for field, values in numeric_fields.items():
-        avg_run[field] = sum(values) / len(values)
+    for run in runs:
+        profit = run.get('accumulated_profit', 0)
+        if profit > top_profit:
+            best_profit, top_profit = run, profit
+        compromised = run.get('compromised_systems', float('inf'))
+        if compromised < low_compromised:
+            best_security, low_compromised = run, compromised
+        availability = run.get('systems_availability', 0)
+        if availability > top_availability:
+            best_availability, top_availability = run, availability
     
-    return avg_run
+    return best_profit, best_security, best_availability
+
+
+def _calculate_average_run(runs: list) -> dict:
+    """Calculate average values across all runs."""
+    if not runs:
+        return {}
+    
+    return {
+        field: total / count
+        for field, (count, total, _, _, _) in _accumulate_numeric_fields(runs).items()
+    }
 
 
 def _calculate_statistics(runs: list) -> dict:
@@ -727,20 +767,13 @@ def _calculate_statistics(runs: list) -> dict:
         'metrics': {}
     }
     
-    numeric_fields = {}
-    for run in runs:
-        for key, value in run.items():
-            if isinstance(value, (int, float)) and key not in ['id']:
-                if key not in numeric_fields:
-                    numeric_fields[key] = []
-                numeric_fields[key].append(value)
-    
-    for field, values in numeric_fields.items():
+    numeric_fields = _accumulate_numeric_fields(runs, keep_values=True)
+    for field, (count, total, lo, hi, values) in numeric_fields.items():
         stats['metrics'][field] = {
-            'min': min(values),
-            'max': max(values),
-            'avg': sum(values) / len(values),
-            'median': sorted(values)[len(values) // 2]
+            'min': lo,
+            'max': hi,
+            'avg': total / count,
+            'median': sorted(values)[count // 2]
         }
     
     return stats
@@ -776,7 +809,7 @@ def create_threshold():
             return jsonify({'error': 'Failed to create threshold'}), 500
     
     except Exception as e:
-        logger.error(f"Error creating threshold: {e}")
+        logger.error("Error creating threshold: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -800,7 +833,7 @@ def get_thresholds():
         }), 200
     
     except Exception as e:
-        logger.error(f"Error fetching thresholds: {e}")
+        logger.error("Error fetching thresholds: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -821,7 +854,7 @@ def get_threshold(threshold_id):
             return jsonify({'error': 'Threshold not found'}), 404
     
     except Exception as e:
-        logger.error(f"Error fetching threshold: {e}")
+        logger.error("Error fetching threshold: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -832,18 +865,19 @@ def update_threshold(threshold_id):
         from data.mongodb_client import ThresholdManager
         
         data = request.json
-        success = ThresholdManager.update_threshold(threshold_id, **data)
+        threshold = ThresholdManager.update_threshold_and_fetch(threshold_id, **data)
         
-        if success:
+        if threshold:
             return jsonify({
                 'success': True,
+                'threshold': threshold,
                 'message': 'Threshold updated successfully'
             }), 200
         else:
             return jsonify({'error': 'Failed to update threshold'}), 500
     
     except Exception as e:
-        logger.error(f"Error updating threshold: {e}")
+        logger.error("Error updating threshold: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -864,7 +898,7 @@ def delete_threshold(threshold_id):
             return jsonify({'error': 'Failed to delete threshold'}), 500
     
     except Exception as e:
-        logger.error(f"Error deleting threshold: {e}")
+        logger.error("Error deleting threshold: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -901,7 +935,7 @@ def log_simulation_run(simulation_id):
             return jsonify({'error': 'Failed to log simulation run'}), 500
     
     except Exception as e:
-        logger.error(f"Error logging simulation run: {e}")
+        logger.error("Error logging simulation run: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -920,7 +954,7 @@ def get_simulation_results(simulation_id):
         }), 200
     
     except Exception as e:
-        logger.error(f"Error fetching simulation results: {e}")
+        logger.error("Error fetching simulation results: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -951,7 +985,7 @@ def log_comparison(simulation_id):
             return jsonify({'error': 'Failed to log comparison'}), 500
     
     except Exception as e:
-        logger.error(f"Error logging comparison: {e}")
+        logger.error("Error logging comparison: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -972,7 +1006,7 @@ def get_threshold_history(threshold_id):
         }), 200
     
     except Exception as e:
-        logger.error(f"Error fetching threshold history: {e}")
+        logger.error("Error fetching threshold history: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -1032,7 +1066,7 @@ def get_threshold_statistics():
         }), 200
     
     except Exception as e:
-        logger.error(f"Error fetching statistics: {e}")
+        logger.error("Error fetching statistics: %s", e)
         return jsonify({
             'success': True,
             'statistics': _dashboard_statistics_shape(None)
@@ -8,6 +8,88 @@ import json
 from typing import List, Dict, Optional
 from datetime import datetime
 
+import numpy as np
+
+NON_METRIC_FIELDS = frozenset({'id', 'source', 'timestamp'})
+
+
+class RunTable:
+    """
+    Column-oriented view of simulation runs.
+    
+    Numeric metrics are stored as contiguous float64 arrays (NaN where a run
+    has no numeric value); identifiers and other non-numeric fields are kept
+    as object arrays in `meta`.
+    """
+    
+    def __init__(self, columns: Dict[str, np.ndarray], meta: Dict[str, np.ndarray],
+                 int_columns: Optional[set] = None):
+        self.columns = columns
+        self.meta = meta
+        self.int_columns = int_columns or set()
+    
+    def __len__(self) -> int:
+        for arr in self.columns.values():
+            return len(arr)
+        for arr in self.meta.values():
+            return len(arr)
+        return 0
+    
+    @classmethod
+    def from_columns(cls, raw: Dict[str, list]) -> 'RunTable':
+        """Build a table from a mapping of field name to per-run values."""
+        columns = {}
+        meta = {}
+        int_columns = set()
+        
+        for key, values in raw.items():
+            numeric = [v if isinstance(v, (int, float)) else np.nan for v in values]
+            if key in NON_METRIC_FIELDS or all(v is np.nan for v in numeric):
+                meta[key] = np.array(values, dtype=object)
+                continue
+            
+            columns[key] = np.array(numeric, dtype=np.float64)
+            if all(isinstance(v, int) for v in values if v is not None):
+                int_columns.add(key)
+        
+        return cls(columns, meta, int_columns)
+    
+    @classmethod
+    def from_records(cls, runs: List[Dict]) -> 'RunTable':
+        """Build a table from a list of run dictionaries."""
+        keys = {}
+        for run in runs:
+            keys.update(dict.fromkeys(run))
+        
+        return cls.from_columns({key: [run.get(key) for run in runs] for key in keys})
+    
+    def to_records(self) -> List[Dict]:
+        """Materialize the table back into a list of run dictionaries."""
+        records = [{} for _ in range(len(self))]
+        
+        for key, arr in self.meta.items():
+            for record, value in zip(records, arr.tolist()):
+                if value is not None:
+                    record[key] = value
+        
+        for key, arr in self.columns.items():
+            cast = int if key in self.int_columns else float
+            for record, value in zip(records, arr.tolist()):
+                if value == value:
+                    record[key] = cast(value)
+        
+        return records
+
+
+def _parse_csv_value(value):
+    """Convert a CSV cell to int or float where possible."""
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except (ValueError, TypeError):
+        return value
+
 
 def load_csv_data(filepath: str = "data/sim_data.csv") -> List[Dict]:
     """Load real simulation data from CSV file."""
@@ -17,6 +99,8 @@ def load_csv_data(filepath: str = "data/sim_data.csv") -> List[Dict]:
         print(f"Warning: {filepath} not found")
         return runs
     
+    loaded_at = datetime.now().isoformat()
+    
     try:
         with open(filepath, 'r') as f:
             reader = csv.DictReader(f)
@@ -24,19 +108,13 @@ def load_csv_data(filepath: str = "data/sim_data.csv") -> List[Dict]:
                 run = {
                     'id': f"real_{idx+1}",
                     'source': 'real_data',
-                    'timestamp': row.get('timestamp', datetime.now().isoformat()),
+                    'timestamp': row.get('timestamp', loaded_at),
                 }
                 
                 for key, value in row.items():
                     if key == 'timestamp':
                         continue
-                    try:
-                        if '.' in value:
-                            run[key] = float(value)
-                        else:
-                            run[key] = int(value)
-                    except (ValueError, AttributeError):
-                        run[key] = value
+                    run[key] = _parse_csv_value(value)
                 
                 runs.append(run)
         
@@ -74,19 +152,26 @@ def load_manual_data(data_dir: str = "data") -> List[Dict]:
 
 def generate_mock_data(count: int = 10) -> List[Dict]:
     """Generate mock simulation data for testing."""
-    import random
+    rng = np.random.default_rng()
+    
+    profits = rng.integers(800000, 2000000, size=count, endpoint=True).tolist()
+    compromised = rng.integers(0, 25, size=count, endpoint=True).tolist()
+    availability = rng.uniform(0.85, 0.99, size=count).round(3).tolist()
+    investment = rng.integers(100000, 500000, size=count, endpoint=True).tolist()
+    recovery = rng.integers(50000, 300000, size=count, endpoint=True).tolist()
+    generated_at = datetime.now().isoformat()
     
     runs = []
     for i in range(count):
         run = {
             'id': f"mock_{i+1}",
             'source': 'mock',
-            'timestamp': datetime.now().isoformat(),
-            'accumulated_profit': random.randint(800000, 2000000),
-            'compromised_systems': random.randint(0, 25),
-            'systems_availability': round(random.uniform(0.85, 0.99), 3),
-            'security_investment': random.randint(100000, 500000),
-            'recovery_cost': random.randint(50000, 300000),
+            'timestamp': generated_at,
+            'accumulated_profit': profits[i],
+            'compromised_systems': compromised[i],
+            'systems_availability': availability[i],
+            'security_investment': investment[i],
+            'recovery_cost': recovery[i],
         }
         runs.append(run)
     
@@ -170,13 +255,47 @@ def get_data_source_info() -> Dict:
     }
 
 
-def compare_runs(real_runs: List[Dict], simulated_runs: List[Dict]) -> Dict:
+def _metric_stats(runs: List[Dict], metric: str) -> Optional[tuple]:
+    """Single pass over runs returning (count, avg, min, max) for a numeric metric."""
+    count = 0
+    total = 0
+    lo = hi = None
+    for run in runs:
+        value = run.get(metric)
+        if not isinstance(value, (int, float)):
+            continue
+        count += 1
+        total += value
+        if lo is None or value < lo:
+            lo = value
+        if hi is None or value > hi:
+            hi = value
+    
+    if not count:
+        return None
+    
+    return count, total / count, lo, hi
+
+
+def _column_stats(table: RunTable, metric: str) -> Optional[tuple]:
+    """Return (count, avg, min, max) for a RunTable column, ignoring NaNs."""
+    values = table.columns[metric]
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return None
+    
+    # Integer columns report int bounds, as _metric_stats does for List[Dict] runs
+    cast = int if metric in table.int_columns else float
+    return int(values.size), float(values.mean()), cast(values.min()), cast(values.max())
+
+
+def compare_runs(real_runs, simulated_runs) -> Dict:
     """
     Compare real data against simulated runs.
     
     Args:
-        real_runs: List of real simulation runs
-        simulated_runs: List of bot-generated simulated runs
+        real_runs: List of real simulation runs, or a RunTable
+        simulated_runs: List of bot-generated simulated runs, or a RunTable
     
     Returns:
         Comparison statistics
@@ -184,12 +303,19 @@ def compare_runs(real_runs: List[Dict], simulated_runs: List[Dict]) -> Dict:
     if not real_runs or not simulated_runs:
         return {'error': 'Need both real and simulated runs for comparison'}
     
-    real_metrics = real_runs[0].keys()
-    sim_metrics = simulated_runs[0].keys()
-    common_metrics = set(real_metrics) & set(sim_metrics)
-    
-    exclude = {'id', 'source', 'timestamp'}
-    numeric_metrics = [m for m in common_metrics if m not in exclude]
+    if isinstance(real_runs, RunTable) and isinstance(simulated_runs, RunTable):
+        numeric_metrics = real_runs.columns.keys() & simulated_runs.columns.keys()
+        real_stats_for = lambda metric: _column_stats(real_runs, metric)
+        sim_stats_for = lambda metric: _column_stats(simulated_runs, metric)
+    else:
+        if isinstance(real_runs, RunTable):
+            real_runs = real_runs.to_records()
+        if isinstance(simulated_runs, RunTable):
+            simulated_runs = simulated_runs.to_records()
+        common_metrics = real_runs[0].keys() & simulated_runs[0].keys()
+        numeric_metrics = common_metrics - NON_METRIC_FIELDS
+        real_stats_for = lambda metric: _metric_stats(real_runs, metric)
+        sim_stats_for = lambda metric: _metric_stats(simulated_runs, metric)
     
     comparison = {
         'metrics': {},
@@ -197,19 +323,14 @@ def compare_runs(real_runs: List[Dict], simulated_runs: List[Dict]) -> Dict:
     }
     
     for metric in numeric_metrics:
-        real_values = [r.get(metric, 0) for r in real_runs if isinstance(r.get(metric), (int, float))]
-        sim_values = [s.get(metric, 0) for s in simulated_runs if isinstance(s.get(metric), (int, float))]
+        real_stats = real_stats_for(metric)
+        sim_stats = sim_stats_for(metric)
         
-        if not real_values or not sim_values:
+        if real_stats is None or sim_stats is None:
             continue
         
-        real_avg = sum(real_values) / len(real_values)
-        sim_avg = sum(sim_values) / len(sim_values)
-        
-        real_min = min(real_values)
-        real_max = max(real_values)
-        sim_min = min(sim_values)
-        sim_max = max(sim_values)
+        real_count, real_avg, real_min, real_max = real_stats
+        sim_count, sim_avg, sim_min, sim_max = sim_stats
         
         difference = sim_avg - real_avg
         percent_diff = (difference / real_avg * 100) if real_avg != 0 else 0
@@ -219,13 +340,13 @@ def compare_runs(real_runs: List[Dict], simulated_runs: List[Dict]) -> Dict:
                 'avg': real_avg,
                 'min': real_min,
                 'max': real_max,
-                'count': len(real_values)
+                'count': real_count
             },
             'simulated': {
                 'avg': sim_avg,
                 'min': sim_min,
                 'max': sim_max,
-                'count': len(sim_values)
+                'count': sim_count
             },
             'difference': difference,
             'percent_difference': percent_diff
@@ -0,0 +1,185 @@
+"""
+Forio Auth Helpers
+Shared OAuth token cache for ForioClient and ForioDataAPI.
+Tokens are kept in a process-wide cache and persisted to disk so both new
+client instances and new CLI invocations can skip re-authentication.
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+TOKEN_CACHE_PATH = os.getenv(
+    "FORIO_TOKEN_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "forio", "token.json")
+)
+
+TOKEN_URL = "https://api.forio.com/v2/oauth/token"
+
+# Refresh slightly before the server-side expiry
+EXPIRY_MARGIN = 60
+
+# Background refresh fires this long before the cached expiry
+REFRESH_LEAD = 120
+# Floor between refresh attempts so a failing token endpoint isn't hammered
+REFRESH_MIN_INTERVAL = 30
+
+# credential digest -> (token, expires_at); shared by every client in the process
+_TOKEN_CACHE: Dict[str, Tuple[str, float]] = {}
+_token_cache_lock = threading.Lock()
+# credential digest -> refresher thread
+_refreshers: Dict[str, threading.Thread] = {}
+
+
+def _credential_key(public_key: str, private_key: str, token_url: str = TOKEN_URL) -> str:
+    """Hash the credentials and endpoint so a cached token is never reused across accounts."""
+    return hashlib.sha256(f"{public_key}:{private_key}:{token_url}".encode()).hexdigest()
+
+
+def load_cached_token(public_key: str, private_key: str) -> Optional[str]:
+    """Return the cached token for these credentials if it has not expired."""
+    key = _credential_key(public_key, private_key)
+    now = time.time()
+
+    with _token_cache_lock:
+        cached = _TOKEN_CACHE.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+
+    try:
+        with open(TOKEN_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cached.get('key') != key:
+        return None
+    if cached.get('expires_at', 0) <= now:
+        return None
+
+    with _token_cache_lock:
+        _TOKEN_CACHE[key] = (cached.get('token'), cached['expires_at'])
+    return cached.get('token')
+
+
+def cached_token_expiry(public_key: str, private_key: str) -> Optional[float]:
+    """Expiry time of this process's cached token for these credentials, or None."""
+    with _token_cache_lock:
+        cached = _TOKEN_CACHE.get(_credential_key(public_key, private_key))
+    return cached[1] if cached else None
+
+
+def save_cached_token(public_key: str, private_key: str, token: str, expires_in: Optional[float]):
+    """Cache a token for this process and atomically persist it with owner-only permissions."""
+    if not token:
+        return
+    if not expires_in:
+        # No expiry to track: keep it for this process only, until a 401 forces a refresh
+        with _token_cache_lock:
+            _TOKEN_CACHE[_credential_key(public_key, private_key)] = (token, float('inf'))
+        return
+
+    payload = {
+        'key': _credential_key(public_key, private_key),
+        'token': token,
+        'expires_at': time.time() + float(expires_in) - EXPIRY_MARGIN
+    }
+
+    with _token_cache_lock:
+        _TOKEN_CACHE[payload['key']] = (token, payload['expires_at'])
+
+    cache_dir = os.path.dirname(TOKEN_CACHE_PATH)
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".token-")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(payload, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Warning: Could not cache Forio token: {e}")
+
+
+def request_token(session, public_key: str, private_key: str, auth_header: str,
+                  force_refresh: bool = False) -> Optional[str]:
+    """
+    Return a valid token for these credentials, requesting one if needed.
+    
+    A cache hit is only trusted while the shared cache says it is unexpired;
+    otherwise a new token is requested from TOKEN_URL. Either way the
+    background refresher is started so the token stays warm.
+    """
+    def refresh():
+        return request_token(session, public_key, private_key, auth_header, force_refresh=True)
+
+    if not force_refresh:
+        cached = load_cached_token(public_key, private_key)
+        if cached:
+            start_token_refresher(public_key, private_key, refresh)
+            return cached
+
+    try:
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": auth_header
+        }
+
+        response = session.post(
+            TOKEN_URL,
+            headers=headers,
+            data={"grant_type": "client_credentials"},
+            timeout=10
+        )
+
+        if response.status_code == 200:
+            payload = response.json()
+            token = payload["access_token"]
+            save_cached_token(public_key, private_key, token, payload.get("expires_in"))
+            start_token_refresher(public_key, private_key, refresh)
+            return token
+    except Exception as e:
+        print(f"Authentication error: {e}")
+
+    return None
+
+
+def start_token_refresher(public_key: str, private_key: str, refresh: Callable[[], Optional[str]]):
+    """
+    Keep the cached token for these credentials warm.
+    
+    Starts at most one daemon thread per credential pair; it sleeps until
+    shortly before the cached token expires and then calls refresh(), which
+    should request a new token and save it via save_cached_token.
+    """
+    key = _credential_key(public_key, private_key)
+    with _token_cache_lock:
+        if key in _refreshers:
+            return
+        thread = threading.Thread(target=_refresh_loop, args=(key, refresh),
+                                  name="forio-token-refresher", daemon=True)
+        _refreshers[key] = thread
+    thread.start()
+
+
+def _refresh_loop(key: str, refresh: Callable[[], Optional[str]]):
+    while True:
+        with _token_cache_lock:
+            cached = _TOKEN_CACHE.get(key)
+            if cached is None or cached[1] == float('inf'):
+                # Nothing cached, or a token without an expiry; nothing to schedule
+                del _refreshers[key]
+                return
+
+        time.sleep(max(REFRESH_MIN_INTERVAL, cached[1] - REFRESH_LEAD - time.time()))
+        try:
+            refresh()
+        except Exception as e:
+            print(f"Warning: Background Forio token refresh failed: {e}")
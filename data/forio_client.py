@@ -4,13 +4,84 @@ Focuses on fetching existing runs with proper error handling.
 """
 
 import os
-import base64
-import requests
-from typing import List, Dict, Optional
+import time
+import asyncio
+import threading
+import binascii
+from collections import OrderedDict
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 
+try:
+    from data.forio_auth import cached_token_expiry, request_token
+    from data.forio_http import get_session
+except ImportError:
+    from forio_auth import cached_token_expiry, request_token
+    from forio_http import get_session
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
+
 load_dotenv()
 
+# Opt-in: multiplex the per-run variable requests over one HTTP/2 connection
+USE_HTTP2 = (os.getenv("FORIO_HTTP2", "").lower() in ("1", "true", "yes")
+             and httpx is not None and h2 is not None)
+
+# Model variables requested alongside each run (see process_forio_data)
+RUN_VARIABLES = (
+    'accumulated_profit', 'compromised_systems', 'systems_availability', 'prevention_budget',
+    'detection_budget', 'response_budget', 'recovery_budget', 'systems_at_risk', 'fraction_to_make_profits',
+    'impact_on_business', 'profits'
+)
+RUN_VARIABLE_SET = frozenset(RUN_VARIABLES)
+# Pre-encoded `include` value for the default variable list
+RUN_VARIABLES_PARAM = quote(','.join(RUN_VARIABLES), safe='')
+
+# Bodies smaller than this are cheaper to decode in one response.json() call
+STREAM_MIN_BYTES = 64 * 1024
+
+# Concurrent per-run variable requests; stays within the session's pool size
+VARIABLE_PROBE_WORKERS = 8
+
+# Saved runs' variables never change, so keep them for the process lifetime
+VARIABLE_CACHE_SIZE = 1024
+# (org, project, run_id) -> variables, least recently used first
+_variable_cache: "OrderedDict[Tuple[str, str, str], Dict]" = OrderedDict()
+_variable_cache_lock = threading.Lock()
+
+# Budget variables mirrored onto the F1-F4 decision levers
+BUDGET_LEVERS = {
+    'prevention_budget': 'F1',
+    'detection_budget': 'F2',
+    'response_budget': 'F3',
+    'recovery_budget': 'F4',
+}
+
+
+def _event_loop_running() -> bool:
+    """True when called from inside a running event loop, where asyncio.run() would raise."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
 class ForioClient:
     """Simplified client for fetching Forio simulation runs."""
     
@@ -20,47 +91,53 @@ class ForioClient:
         self.org = os.getenv("FORIO_ORG", "mitcams")
         self.project = os.getenv("FORIO_PROJECT", "cyberriskmanagement-ransomeware-2023")
         self.token = None
+        self._token_lock = threading.Lock()
+        # org/project are fixed for the client's lifetime, so compose URLs once
+        self._runs_url_template = (
+            f"https://forio.com/v2/run/{self.org}/{self.project}/;saved=true;trashed=false"
+            "?sort=created&direction=desc&startRecord={start}&endRecord={end}"
+        )
+        # Variable endpoint that last answered for this project, tried first
+        self._variable_url_template: Optional[str] = None
+        self._variable_url_templates = (
+            "https://api.forio.com/v2/model/run/{run_id}/variables",
+            f"https://api.forio.com/v2/run/{self.org}/{self.project}/{{run_id}}/variables"
+        )
+        # Last successful test_connection result; diagnostics reuse it until the token expires
+        self._connection_status = None
+        self._connection_status_expires = 0.0
+        self.session = get_session()
+        # Credentials are static, so encode the token request header once
+        self._basic_auth_header = None
+        if self.public_key and self.private_key:
+            self._basic_auth_header = "Basic " + binascii.b2a_base64(
+                f"{self.public_key}:{self.private_key}".encode(), newline=False
+            ).decode()
     
     def is_configured(self) -> bool:
         """Check if credentials are configured."""
         return bool(self.public_key and self.private_key)
     
-    def _get_token(self) -> Optional[str]:
+    def _get_token(self, force_refresh: bool = False) -> Optional[str]:
         """Get OAuth token from Forio."""
         if not self.is_configured():
             return None
         
-        if self.token:
-            return self.token
-        
-        try:
-            creds = base64.b64encode(
-                f"{self.public_key}:{self.private_key}".encode()
-            ).decode()
-            
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Authorization": f"Basic {creds}"
-            }
-            
-            response = requests.post(
-                "https://api.forio.com/v2/oauth/token",
-                headers=headers,
-                data={"grant_type": "client_credentials"},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                self.token = response.json()["access_token"]
-                return self.token
-            
-        except Exception as e:
-            print(f"Authentication error: {e}")
-        
-        return None
+        with self._token_lock:
+            return self._request_token(force_refresh)
+    
+    def _request_token(self, force_refresh: bool) -> Optional[str]:
+        """Return the shared cached token or request a new one; caller holds _token_lock."""
+        # A stale self.token is never reused: the shared cache decides expiry
+        self.token = request_token(self.session, self.public_key, self.private_key,
+                                   self._basic_auth_header, force_refresh)
+        return self.token
     
     def test_connection(self) -> Dict:
         """Test connection and return status."""
+        if self._connection_status and time.time() < self._connection_status_expires:
+            return dict(self._connection_status)
+        
         status = {
             'configured': self.is_configured(),
             'authenticated': False,
@@ -90,14 +167,23 @@ class ForioClient:
         except:
             pass
         
+        if status['runs_found']:
+            self._connection_status = dict(status)
+            self._connection_status_expires = cached_token_expiry(self.public_key, self.private_key) or 0.0
         return status
     
-    def fetch_runs(self, limit: int = 20) -> List[Dict]:
+    def fetch_runs(self, limit: int = 20, fields: Optional[Sequence[str]] = RUN_VARIABLES) -> List[Dict]:
         """
         Fetch saved simulation runs.
         
         Returns runs with metadata. Variables may or may not be present
         depending on Vensim model configuration.
+        
+        Args:
+            limit: Maximum number of runs to fetch
+            fields: Variables to embed in the run list response via `include`.
+                    Runs that come back without them fall back to a per-run
+                    variables request. Pass None to always use the fallback.
         """
         token = self._get_token()
         if not token:
@@ -105,65 +191,148 @@ class ForioClient:
         
         try:
             headers = {"Authorization": f"Bearer {token}"}
-            url = f"https://forio.com/v2/run/{self.org}/{self.project}/;saved=true;trashed=false"
-            url += f"?sort=created&direction=desc&startRecord=0&endRecord={limit}"
-            
-            response = requests.get(url, headers=headers, timeout=15)
+            url = self._runs_url_template.format(start=0, end=limit - 1)
+            if fields:
+                include = RUN_VARIABLES_PARAM if fields is RUN_VARIABLES else quote(','.join(fields), safe='')
+                url += f"&include={include}"
             
-            if response.status_code == 200:
-                runs = response.json()
+            with self.session.get(url, headers=headers, timeout=15,
+                                  stream=ijson is not None) as response:
+                if response.status_code != 200:
+                    return []
                 
-                for run in runs:
-                    self._try_fetch_variables(run, headers)
-                
-                return runs
+                runs = []
+                pending = []
+                for run in self._iter_json_array(response):
+                    variables = run.get('variables')
+                    if fields and variables:
+                        self.process_forio_data(variables, run)
+                    elif run.get('id'):
+                        pending.append(run)
+                    runs.append(run)
+            
+            if pending:
+                self._fetch_missing_variables(pending, headers)
+            
+            return runs
             
         except Exception as e:
             print(f"Error fetching runs: {e}")
         
         return []
     
-    def _try_fetch_variables(self, run: Dict, headers: Dict):
-        """Try to fetch variables for a run (may not exist)."""
-        run_id = run.get('id')
-        if not run_id:
+    @staticmethod
+    def _iter_json_array(response):
+        """Yield the items of a JSON array response, parsing large bodies incrementally."""
+        length = response.headers.get('Content-Length')
+        if ijson is None or (length and int(length) < STREAM_MIN_BYTES):
+            yield from response.json()
             return
         
-        endpoints = [
-            f"https://api.forio.com/v2/model/run/{run_id}/variables",
-            f"https://api.forio.com/v2/run/{self.org}/{self.project}/{run_id}/variables"
-        ]
+        response.raw.decode_content = True
+        yield from ijson.items(response.raw, 'item', use_float=True)
+    
+    def _fetch_missing_variables(self, runs: List[Dict], headers: Dict):
+        """Probe the variables endpoints for several runs concurrently."""
+        missing = []
+        with _variable_cache_lock:
+            for run in runs:
+                variables = _variable_cache.get((self.org, self.project, run['id']))
+                if variables is None:
+                    missing.append(run)
+                else:
+                    _variable_cache.move_to_end((self.org, self.project, run['id']))
+                    self._apply_variables(run, variables)
+        
+        if not missing:
+            return
         
-        for endpoint in endpoints:
+        if USE_HTTP2 and not _event_loop_running():
+            results = asyncio.run(self._fetch_variables_http2(missing, headers))
+            for run, variables in zip(missing, results):
+                if variables:
+                    self._apply_variables(run, variables, cache=True)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(VARIABLE_PROBE_WORKERS, len(missing))) as executor:
+            futures = {
+                executor.submit(self._fetch_variables, run['id'], headers): run
+                for run in missing
+            }
+            for future in as_completed(futures):
+                variables = future.result()
+                if variables:
+                    self._apply_variables(futures[future], variables, cache=True)
+    
+    def _apply_variables(self, run: Dict, variables: Dict, cache: bool = False):
+        """Attach fetched variables to a run, optionally remembering them for later calls."""
+        run['variables'] = variables
+        self.process_forio_data(variables, run)
+        
+        if cache:
+            with _variable_cache_lock:
+                _variable_cache[(self.org, self.project, run['id'])] = variables
+                if len(_variable_cache) > VARIABLE_CACHE_SIZE:
+                    _variable_cache.popitem(last=False)
+    
+    def _variable_probe_order(self) -> Sequence[str]:
+        """Variable endpoint templates, the last one that answered first."""
+        discovered = self._variable_url_template
+        if not discovered:
+            return self._variable_url_templates
+        return (discovered,) + tuple(t for t in self._variable_url_templates if t != discovered)
+    
+    def _fetch_variables(self, run_id: str, headers: Dict) -> Optional[Dict]:
+        """Try to fetch variables for a run (may not exist)."""
+        discovered = self._variable_url_template
+        for template in self._variable_probe_order():
             try:
-                response = requests.get(endpoint, headers=headers, timeout=5)
-                if response.status_code == 200:
-                    variables = response.json()
-                    if variables:
-                        run['variables'] = variables
-                        self.process_forio_data(variables, run)
-                        return
+                response = self.session.get(template.format(run_id=run_id), headers=headers, timeout=5)
+                # A 200 with a non-JSON body (e.g. an HTML error page) only skips this endpoint
+                variables = response.json() if response.status_code == 200 else None
             except:
                 continue
+            if variables:
+                self._variable_url_template = template
+                return variables
+            # Only re-probe the other endpoints if the known-good one 404s; any other
+            # error from it (401, 5xx, an empty body) is reported as no variables
+            if template == discovered and response.status_code != 404:
+                return None
+        return None
+    
+    async def _fetch_variables_http2(self, runs: List[Dict], headers: Dict) -> List[Optional[Dict]]:
+        """Fetch variables for several runs as concurrent streams on one HTTP/2 connection."""
+        limits = httpx.Limits(max_connections=VARIABLE_PROBE_WORKERS,
+                              max_keepalive_connections=VARIABLE_PROBE_WORKERS)
+        async with httpx.AsyncClient(http2=True, headers=headers, timeout=30, limits=limits) as client:
+            return await asyncio.gather(*(self._fetch_variables_async(client, run['id']) for run in runs))
+    
+    async def _fetch_variables_async(self, client, run_id: str) -> Optional[Dict]:
+        """Async counterpart of _fetch_variables."""
+        discovered = self._variable_url_template
+        for template in self._variable_probe_order():
+            try:
+                response = await client.get(template.format(run_id=run_id), timeout=5)
+                variables = response.json() if response.status_code == 200 else None
+            except (httpx.HTTPError, ValueError):
+                continue
+            if variables:
+                self._variable_url_template = template
+                return variables
+            if template == discovered and response.status_code != 404:
+                return None
+        return None
     
     def process_forio_data(self, variables, run):
         """Process Forio data and map to run variables."""
         try:
-            for var in ['accumulated_profit', 'compromised_systems', 'systems_availability', 'prevention_budget',
-                        'detection_budget', 'response_budget', 'recovery_budget', 'systems_at_risk', 'fraction_to_make_profits',
-                        'impact_on_business', 'profits']:
-                if var in variables:
-                    run[var] = variables[var]
-
-            if 'prevention_budget' in variables:
-                run['F1'] = variables.get('prevention_budget')
-            if 'detection_budget' in variables:
-                run['F2'] = variables.get('detection_budget')
-            if 'response_budget' in variables:
-                run['F3'] = variables.get('response_budget')
-            if 'recovery_budget' in variables:
-                run['F4'] = variables.get('recovery_budget')
-            return
+            present = RUN_VARIABLE_SET & variables.keys()
+            run.update({var: variables[var] for var in present})
+            
+            for budget, lever in BUDGET_LEVERS.items():
+                if budget in present:
+                    run[lever] = variables[budget]
         except Exception as e:
             print(f"Error processing Forio data: {e}")
 
@@ -5,11 +5,25 @@ This allows storing simulation runs with F1-F4 inputs and all outputs in collect
 """
 
 import os
+import threading
+import itertools
 import json
-import requests
-from typing import List, Dict, Optional
+import binascii
+from typing import List, Dict, Iterator, Optional
 from dotenv import load_dotenv
 
+try:
+    from data.forio_auth import request_token
+    from data.forio_http import get_session
+except ImportError:
+    from forio_auth import request_token
+    from forio_http import get_session
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 load_dotenv()
 
 
@@ -23,41 +37,31 @@ class ForioDataAPI:
         self.project = os.getenv("FORIO_PROJECT", "cyberriskmanagement-ransomeware-2023")
         self.collection_name = os.getenv("DATA_COLLECTION", "simulation-results")
         self.token = None
+        self._token_lock = threading.Lock()
+        self.session = get_session()
+        # Credentials are static, so encode the token request header once
+        self._basic_auth_header = None
+        if self.public_key and self.private_key:
+            self._basic_auth_header = "Basic " + binascii.b2a_base64(
+                f"{self.public_key}:{self.private_key}".encode(), newline=False
+            ).decode()
         self.base_url = "https://api.forio.com/v2/data"
+        self._collection_url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}"
     
-    def _get_token(self) -> Optional[str]:
+    def _get_token(self, force_refresh: bool = False) -> Optional[str]:
         """Get OAuth access token."""
-        if self.token:
-            return self.token
-        
         if not self.public_key or not self.private_key:
             return None
         
-        try:
-            import base64
-            creds = base64.b64encode(
-                f"{self.public_key}:{self.private_key}".encode()
-            ).decode()
-            
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Authorization": f"Basic {creds}"
-            }
-            
-            response = requests.post(
-                "https://api.forio.com/v2/oauth/token",
-                headers=headers,
-                data={"grant_type": "client_credentials"},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                self.token = response.json()["access_token"]
-                return self.token
-        except Exception as e:
-            print(f"Authentication error: {e}")
-        
-        return None
+        with self._token_lock:
+            return self._request_token(force_refresh)
+    
+    def _request_token(self, force_refresh: bool) -> Optional[str]:
+        """Return the shared cached token or request a new one; caller holds _token_lock."""
+        # A stale self.token is never reused: the shared cache decides expiry
+        self.token = request_token(self.session, self.public_key, self.private_key,
+                                   self._basic_auth_header, force_refresh)
+        return self.token
     
     def is_configured(self) -> bool:
         """Check if credentials are configured."""
@@ -87,17 +91,17 @@ class ForioDataAPI:
         clean_data = {k: v for k, v in result_data.items() if v is not None}
         
         if document_id:
-            url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}/{document_id}"
+            url = f"{self._collection_url}/{document_id}"
             method = "PUT"
         else:
-            url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}"
+            url = self._collection_url
             method = "POST"
         
         try:
             if method == "PUT":
-                response = requests.put(url, headers=headers, json=clean_data, timeout=15)
+                response = self.session.put(url, headers=headers, json=clean_data, timeout=15)
             else:
-                response = requests.post(url, headers=headers, json=clean_data, timeout=15)
+                response = self.session.post(url, headers=headers, json=clean_data, timeout=15)
             
             if response.status_code in [200, 201]:
                 saved_doc = response.json()
@@ -127,10 +131,10 @@ class ForioDataAPI:
             return None
         
         headers = {"Authorization": f"Bearer {token}"}
-        url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}/{document_id}"
+        url = f"{self._collection_url}/{document_id}"
         
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, headers=headers, timeout=10)
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 404:
@@ -161,12 +165,26 @@ class ForioDataAPI:
         Returns:
             List of documents
         """
+        return list(self.iter_all_results(include_fields, exclude_fields, sort_by, direction, limit))
+    
+    def iter_all_results(self, include_fields: Optional[List[str]] = None, 
+                         exclude_fields: Optional[List[str]] = None,
+                         sort_by: Optional[str] = None,
+                         direction: str = "desc",
+                         limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream simulation results from the collection one document at a time.
+        
+        Takes the same arguments as get_all_results. When ijson is installed the
+        response body is parsed incrementally, so memory stays flat regardless of
+        collection size; otherwise the body is parsed in one go.
+        """
         token = self._get_token()
         if not token:
-            return []
+            return
         
         headers = {"Authorization": f"Bearer {token}"}
-        url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}"
+        url = self._collection_url
         
         params = {}
         if include_fields:
@@ -181,20 +199,30 @@ class ForioDataAPI:
             headers['Range'] = f"records 0-{limit-1}"
         
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
-            
-            if response.status_code in [200, 206]:
+            with self.session.get(url, headers=headers, params=params, timeout=15,
+                              stream=ijson is not None) as response:
+                if response.status_code not in [200, 206]:
+                    print(f"Error retrieving results: HTTP {response.status_code}")
+                    return
+                
+                if ijson is not None:
+                    response.raw.decode_content = True
+                    events = ijson.parse(response.raw, use_float=True)
+                    first = next(events, None)
+                    if first is None:
+                        return
+                    # A single record comes back as a bare object rather than an array
+                    prefix = '' if first[1] == 'start_map' else 'item'
+                    yield from ijson.items(itertools.chain([first], events), prefix)
+                    return
+                
                 results = response.json()
                 if isinstance(results, list):
-                    return results
-                else:
-                    return [results] if results else []
-            else:
-                print(f"Error retrieving results: HTTP {response.status_code}")
-                return []
+                    yield from results
+                elif results:
+                    yield results
         except Exception as e:
             print(f"Error: {e}")
-            return []
     
     def search_results(self, query: Dict, limit: Optional[int] = None) -> List[Dict]:
         """
@@ -214,7 +242,7 @@ class ForioDataAPI:
             return []
         
         headers = {"Authorization": f"Bearer {token}"}
-        url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}"
+        url = self._collection_url
         
         query_str = json.dumps(query)
         params = {'q': query_str}
@@ -223,7 +251,7 @@ class ForioDataAPI:
             headers['Range'] = f"records 0-{limit-1}"
         
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
+            response = self.session.get(url, headers=headers, params=params, timeout=15)
             
             if response.status_code in [200, 206]:
                 results = response.json()
@@ -253,10 +281,10 @@ class ForioDataAPI:
             return False
         
         headers = {"Authorization": f"Bearer {token}"}
-        url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}/{document_id}"
+        url = f"{self._collection_url}/{document_id}"
         
         try:
-            response = requests.delete(url, headers=headers, timeout=10)
+            response = self.session.delete(url, headers=headers, timeout=10)
             if response.status_code == 204:
                 print(f"Deleted document: {document_id}")
                 return True
@@ -285,14 +313,14 @@ class ForioDataAPI:
             "Content-Type": "application/json",
             "Authorization": f"Bearer {token}"
         }
-        url = f"{self.base_url}/{self.org}/{self.project}/{self.collection_name}"
+        url = self._collection_url
         
         for result in results:
             if 'id' not in result:
                 result['id'] = f"run_{hash(json.dumps(result, sort_keys=True))}"
         
         try:
-            response = requests.put(url, headers=headers, json=results, timeout=30)
+            response = self.session.put(url, headers=headers, json=results, timeout=30)
             
             if response.status_code in [200, 201]:
                 saved_docs = response.json()
@@ -0,0 +1,64 @@
+"""
+Forio HTTP Helpers
+Shared requests.Session for ForioClient and ForioDataAPI.
+Reusing one pooled session keeps TCP/TLS connections to forio.com and
+api.forio.com alive across token, run-list and variable requests, and
+rate-limit / transient-error retries happen inside urllib3 on the same
+keep-alive connection.
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from data.forio_auth import TOKEN_URL
+except ImportError:
+    from forio_auth import TOKEN_URL
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 20
+
+# Rate-limit / transient-error retries; Retry-After wins over backoff_factor
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 1.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = ("GET",)
+# Only the OAuth token POST is safe to repeat; Data API POSTs create documents
+TOKEN_RETRY_METHODS = ("GET", "POST")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _adapter(methods) -> HTTPAdapter:
+    """Pooled adapter retrying rate-limit / transient errors for the given methods."""
+    return HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(
+            total=MAX_RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=methods,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide Forio session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _adapter(RETRY_METHODS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                # requests picks the longest matching prefix, so token calls get their own retries
+                session.mount(TOKEN_URL, _adapter(TOKEN_RETRY_METHODS))
+                _session = session
+    return _session
@@ -4,19 +4,41 @@ Handles threshold management and real-time comparison during simulations
 """
 
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import copy
+import time
+import struct
+import atexit
+import threading
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Any, Union
 import logging
+import bson
 from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
 
 logger = logging.getLogger(__name__)
 
+_client = None
 _db = None
+_thresholds_coll = None
+_runs_coll = None
+_comparisons_coll = None
+# Fire-and-forget (w=0) handles for buffered telemetry, keyed by collection name
+_unacked_colls = {}
+
+# Keep a warm pool of sockets so hot logging paths skip the TCP/TLS handshake
+POOL_OPTIONS = {
+    "maxPoolSize": 50,
+    "minPoolSize": 5,
+    "maxIdleTimeMS": 60000,
+}
 
 
 def init_mongodb():
     """Initialize MongoDB connection."""
-    global _db
+    global _client, _db, _thresholds_coll, _runs_coll, _comparisons_coll
     if _db is None:
         try:
             from pymongo import MongoClient
@@ -27,41 +49,327 @@ def init_mongodb():
             )
             db_name = os.getenv("MONGODB_DB", "agentic_research")
             
-            client = MongoClient(mongo_uri)
-            _db = client[db_name]
+            _client = MongoClient(mongo_uri, **POOL_OPTIONS)
+            _db = _client[db_name]
             
             _db.command("ping")
-            logger.info(f"MongoDB connected: {db_name}")
+            logger.info("MongoDB connected: %s", db_name)
             
             _ensure_collections()
             
+            _thresholds_coll = _db["thresholds"]
+            _runs_coll = _db["simulation_runs"]
+            _comparisons_coll = _db["comparisons"]
+            
+            from pymongo import WriteConcern
+            unacked = WriteConcern(w=0)
+            _unacked_colls["simulation_runs"] = _runs_coll.with_options(write_concern=unacked)
+            _unacked_colls["comparisons"] = _comparisons_coll.with_options(write_concern=unacked)
+            
         except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {e}")
-            _db = None
+            logger.error("Failed to connect to MongoDB: %s", e)
+            close_mongodb()
     
     return _db
 
 
+def close_mongodb():
+    """Close the MongoDB client and drop cached handles."""
+    global _client, _db, _thresholds_coll, _runs_coll, _comparisons_coll
+    if _client is not None:
+        _client.close()
+    _client = None
+    _db = None
+    _thresholds_coll = None
+    _runs_coll = None
+    _comparisons_coll = None
+    _unacked_colls.clear()
+
+
+# Single-field indexes from earlier releases, superseded by the compound indexes below
+SUPERSEDED_INDEXES = {
+    "thresholds": ["agent_name_1", "created_at_1"],
+    "simulation_runs": ["simulation_id_1", "timestamp_1", "threshold_id_1"],
+    "comparisons": ["simulation_id_1", "timestamp_1"],
+}
+
+
 def _ensure_collections():
-    """Create necessary collections and indexes."""
+    """Create necessary indexes (collections are created on first write)."""
     if _db is None:
         return
     
-    if "thresholds" not in _db.list_collection_names():
-        _db.create_collection("thresholds")
-        _db.thresholds.create_index("agent_name")
-        _db.thresholds.create_index("created_at")
+    from pymongo.errors import OperationFailure
     
-    if "simulation_runs" not in _db.list_collection_names():
-        _db.create_collection("simulation_runs")
-        _db.simulation_runs.create_index("simulation_id")
-        _db.simulation_runs.create_index("timestamp")
-        _db.simulation_runs.create_index("threshold_id")
+    # Existing deployments still carry the old indexes, which cost a write on every insert
+    for coll_name, index_names in SUPERSEDED_INDEXES.items():
+        for index_name in index_names:
+            try:
+                _db[coll_name].drop_index(index_name)
+            except OperationFailure:
+                pass  # already dropped, or the collection does not exist yet
     
-    if "comparisons" not in _db.list_collection_names():
-        _db.create_collection("comparisons")
-        _db.comparisons.create_index("simulation_id")
-        _db.comparisons.create_index("timestamp")
+    # create_index is a no-op when the index already exists
+    _db.thresholds.create_index([("agent_name", 1), ("is_active", 1)])
+    _db.thresholds.create_index("is_active")
+    
+    _db.simulation_runs.create_index([("simulation_id", 1), ("agent_name", 1), ("kpi_name", 1)])
+    # get_statistics filtered by agent (and optionally threshold): equality prefix, then the
+    # timestamp range, with status in the key so the count needs no document fetch
+    _db.simulation_runs.create_index([
+        ("agent_name", 1), ("threshold_id", 1), ("timestamp", -1), ("status", 1)
+    ])
+    # get_statistics without an agent (days only, or threshold only) can't seek on the index
+    # above; this one serves the timestamp range, and threshold-only calls filter the range
+    # after fetching each document
+    _db.simulation_runs.create_index([("timestamp", -1), ("status", 1)])
+    
+    _db.comparisons.create_index([("threshold_id", 1), ("timestamp", -1)])
+
+
+# Projections limiting reads to the fields the API actually returns
+THRESHOLD_FIELDS = {
+    "agent_name": 1, "kpi_name": 1, "min_value": 1, "max_value": 1, "target_value": 1,
+    "description": 1, "is_active": 1, "created_at": 1, "updated_at": 1
+}
+RUN_RESULT_FIELDS = {
+    "threshold_id": 1, "agent_name": 1, "kpi_name": 1, "actual_value": 1,
+    "target_value": 1, "status": 1, "timestamp": 1
+}
+COMPARISON_FIELDS = {
+    "simulation_id": 1, "is_within_threshold": 1, "actual_value": 1,
+    "threshold_min": 1, "threshold_max": 1, "notes": 1, "timestamp": 1
+}
+
+
+@lru_cache(maxsize=1024)
+def _status_classifier(
+    min_value: Optional[float],
+    max_value: Optional[float],
+    target_value: Optional[float]
+) -> Callable[[float], str]:
+    """
+    Build a status function for one threshold with its bounds baked in.
+    
+    Missing bounds become infinities so the hot path is a fixed chain of
+    comparisons. The target band allows +/-10% around target_value.
+    """
+    if min_value is None and max_value is None and target_value is None:
+        # Nothing to compare against, so a missing actual_value is still on target
+        def classify(actual_value):
+            return "on_target"
+        return classify
+    
+    lo = min_value if min_value is not None else float("-inf")
+    hi = max_value if max_value is not None else float("inf")
+    
+    if target_value is None:
+        def classify(actual_value):
+            if actual_value < lo:
+                return "below_min"
+            if actual_value > hi:
+                return "above_max"
+            return "on_target"
+        return classify
+    
+    tolerance = abs(target_value) * 0.1
+    band_lo = target_value - tolerance
+    band_hi = target_value + tolerance
+    
+    def classify(actual_value):
+        if actual_value < lo:
+            return "below_min"
+        if actual_value > hi:
+            return "above_max"
+        if band_lo <= actual_value <= band_hi:
+            return "on_target"
+        return "off_target"
+    return classify
+
+
+# typed: 1, 1.0 and True hash equal but encode as int32, double and bool
+@lru_cache(maxsize=1024, typed=True)
+def _run_doc_prefix(
+    simulation_id: str,
+    threshold_id: Union[str, ObjectId],
+    agent_name: str,
+    kpi_name: str,
+    target_value: Optional[float],
+    min_value: Optional[float],
+    max_value: Optional[float]
+) -> bytes:
+    """
+    Encoded BSON elements for the fields shared by every run of one
+    threshold within a simulation (no length header or terminator).
+    """
+    return bson.encode({
+        "simulation_id": simulation_id,
+        "threshold_id": threshold_id,
+        "agent_name": agent_name,
+        "kpi_name": kpi_name,
+        "target_value": target_value,
+        "min_value": min_value,
+        "max_value": max_value
+    })[4:-1]
+
+
+def _raw_run_doc(prefix: bytes, fields: Dict) -> RawBSONDocument:
+    """Splice the per-run fields onto a cached prefix into one raw document."""
+    body = prefix + bson.encode(fields)[4:-1]
+    return RawBSONDocument(struct.pack("<i", len(body) + 5) + body + b"\x00")
+
+
+class WriteBuffer:
+    """
+    Accumulates inserts for one collection and writes them with a single
+    unordered bulk_write once `max_docs` are queued or `max_age` seconds
+    have passed since the first queued document.
+    
+    Background flushes use an unacknowledged (w=0) write concern: buffered
+    documents are telemetry, so the flush does not wait for the server and
+    write errors are not reported back. Callers that read the collection
+    right after flushing must pass acknowledged=True, since a w=0 write on
+    one pooled socket is not guaranteed to be visible to a read on another.
+    """
+    
+    def __init__(self, collection_name: str, max_docs: int = 500, max_age: float = 5.0):
+        self.collection_name = collection_name
+        self.max_docs = max_docs
+        self.max_age = max_age
+        self._ops = []
+        self._first_queued = None
+        self._timer = None
+        self._lock = threading.Lock()
+    
+    def add(self, doc: Union[Dict, RawBSONDocument]):
+        """Queue a document, flushing if the buffer is full or stale."""
+        from pymongo import InsertOne
+        
+        with self._lock:
+            if not self._ops:
+                self._first_queued = time.monotonic()
+            self._ops.append(InsertOne(doc))
+            due = (len(self._ops) >= self.max_docs or
+                   time.monotonic() - self._first_queued >= self.max_age)
+            if not due and self._timer is None:
+                # An idle buffer still gets written max_age after its first document
+                self._timer = threading.Timer(self.max_age, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        
+        if due:
+            self.flush()
+    
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+    
+    def flush(self, acknowledged: bool = False) -> int:
+        """
+        Write all queued documents.
+        
+        Returns the number of documents the server confirmed as inserted;
+        always 0 for an unacknowledged flush. When no collection handle is
+        available (before init_mongodb or after close_mongodb) the documents
+        stay queued for the next flush.
+        """
+        if acknowledged:
+            collection = _db[self.collection_name] if _db is not None else None
+        else:
+            collection = _unacked_colls.get(self.collection_name)
+        
+        with self._lock:
+            if not self._ops or collection is None:
+                return 0
+            ops, self._ops = self._ops, []
+            self._first_queued = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        
+        try:
+            result = collection.bulk_write(ops, ordered=False)
+            return result.inserted_count if acknowledged else 0
+        except Exception as e:
+            logger.error("Error flushing %s buffer: %s", self.collection_name, e)
+            details = getattr(e, "details", None) or {}
+            return details.get("nInserted", 0) if acknowledged else 0
+
+
+_runs_buffer = WriteBuffer("simulation_runs")
+_comparisons_buffer = WriteBuffer("comparisons")
+
+
+def flush_buffers(acknowledged: bool = False):
+    """Write any buffered simulation runs and comparisons."""
+    _runs_buffer.flush(acknowledged)
+    _comparisons_buffer.flush(acknowledged)
+
+
+atexit.register(flush_buffers)
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds."""
+    
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return a copy of the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+    
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Thresholds change rarely but are read on every simulation log, so keep them warm
+_threshold_cache = TTLCache()
+_agent_thresholds_cache = TTLCache()
+
+
+def _invalidate_threshold(threshold_id: Optional[Union[str, ObjectId]] = None):
+    """Drop cached thresholds after a write."""
+    if threshold_id is not None:
+        _threshold_cache.pop(str(threshold_id))
+    _agent_thresholds_cache.clear()
+
+
+@lru_cache(maxsize=1024)
+def _parse_object_id(threshold_id: str) -> ObjectId:
+    return ObjectId(threshold_id)
+
+
+def _as_object_id(threshold_id: Union[str, ObjectId]) -> ObjectId:
+    """Accept either form at the API boundary; string IDs are parsed once and reused."""
+    if isinstance(threshold_id, ObjectId):
+        return threshold_id
+    return _parse_object_id(threshold_id)
 
 
 class ThresholdManager:
@@ -90,12 +398,12 @@ class ThresholdManager:
         Returns:
             ObjectId of created threshold as string, or None on error
         """
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             logger.warning("MongoDB not available, threshold not saved")
             return None
         
         try:
+            now = datetime.now(timezone.utc)
             threshold_doc = {
                 "agent_name": agent_name,
                 "kpi_name": kpi_name,
@@ -103,114 +411,156 @@ class ThresholdManager:
                 "max_value": max_value,
                 "target_value": target_value,
                 "description": description,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
+                "created_at": now,
+                "updated_at": now,
                 "is_active": True
             }
             
-            result = db.thresholds.insert_one(threshold_doc)
-            logger.info(f"✓ Threshold created: {agent_name} - {kpi_name}")
+            result = _thresholds_coll.insert_one(threshold_doc)
+            _invalidate_threshold()
+            logger.info("✓ Threshold created: %s - %s", agent_name, kpi_name)
             return str(result.inserted_id)
         
         except Exception as e:
-            logger.error(f"Error creating threshold: {e}")
+            logger.error("Error creating threshold: %s", e)
             return None
     
     @staticmethod
-    def get_threshold(threshold_id: str) -> Optional[Dict]:
+    def get_threshold(threshold_id: Union[str, ObjectId]) -> Optional[Dict]:
         """Get a specific threshold by ID."""
-        db = init_mongodb()
-        if db is None:
+        threshold_id = str(threshold_id)
+        cached = _threshold_cache.get(threshold_id)
+        if cached is not None:
+            return cached
+        
+        if _db is None and init_mongodb() is None:
             return None
         
         try:
-            threshold = db.thresholds.find_one({"_id": ObjectId(threshold_id)})
+            threshold = _thresholds_coll.find_one({"_id": _as_object_id(threshold_id)}, THRESHOLD_FIELDS)
             if threshold:
                 threshold["_id"] = str(threshold["_id"])
+                _threshold_cache.set(threshold_id, threshold)
             return threshold
         except Exception as e:
-            logger.error(f"Error fetching threshold: {e}")
+            logger.error("Error fetching threshold: %s", e)
             return None
     
     @staticmethod
     def get_agent_thresholds(agent_name: str) -> List[Dict]:
         """Get all active thresholds for an agent."""
-        db = init_mongodb()
-        if db is None:
+        cached = _agent_thresholds_cache.get(agent_name)
+        if cached is not None:
+            return cached
+        
+        if _db is None and init_mongodb() is None:
             return []
         
         try:
-            thresholds = list(db.thresholds.find({
+            thresholds = list(_thresholds_coll.find({
                 "agent_name": agent_name,
                 "is_active": True
-            }))
+            }, THRESHOLD_FIELDS))
             
             for t in thresholds:
                 t["_id"] = str(t["_id"])
             
+            _agent_thresholds_cache.set(agent_name, thresholds)
             return thresholds
         except Exception as e:
-            logger.error(f"Error fetching agent thresholds: {e}")
+            logger.error("Error fetching agent thresholds: %s", e)
             return []
     
     @staticmethod
     def update_threshold(
-        threshold_id: str,
+        threshold_id: Union[str, ObjectId],
         **updates
     ) -> bool:
         """Update a threshold."""
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             return False
         
         try:
-            updates["updated_at"] = datetime.utcnow()
-            result = db.thresholds.update_one(
-                {"_id": ObjectId(threshold_id)},
+            updates["updated_at"] = datetime.now(timezone.utc)
+            result = _thresholds_coll.update_one(
+                {"_id": _as_object_id(threshold_id)},
                 {"$set": updates}
             )
+            _invalidate_threshold(threshold_id)
             return result.modified_count > 0
         except Exception as e:
-            logger.error(f"Error updating threshold: {e}")
+            logger.error("Error updating threshold: %s", e)
             return False
     
     @staticmethod
-    def delete_threshold(threshold_id: str) -> bool:
+    def update_threshold_and_fetch(
+        threshold_id: Union[str, ObjectId],
+        **updates
+    ) -> Optional[Dict]:
+        """Update a threshold and return the updated document in one round trip."""
+        if _db is None and init_mongodb() is None:
+            return None
+        
+        try:
+            from pymongo import ReturnDocument
+            
+            updates["updated_at"] = datetime.now(timezone.utc)
+            threshold = _thresholds_coll.find_one_and_update(
+                {"_id": _as_object_id(threshold_id)},
+                {"$set": updates},
+                projection=THRESHOLD_FIELDS,
+                return_document=ReturnDocument.AFTER
+            )
+            _invalidate_threshold(threshold_id)
+            if threshold:
+                threshold["_id"] = str(threshold["_id"])
+                _threshold_cache.set(threshold["_id"], threshold)
+            return threshold
+        except Exception as e:
+            logger.error("Error updating threshold: %s", e)
+            return None
+    
+    @staticmethod
+    def delete_threshold(threshold_id: Union[str, ObjectId]) -> bool:
         """Soft delete a threshold (mark as inactive)."""
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             return False
         
         try:
-            result = db.thresholds.update_one(
-                {"_id": ObjectId(threshold_id)},
-                {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
+            result = _thresholds_coll.update_one(
+                {"_id": _as_object_id(threshold_id)},
+                {"$set": {"is_active": False, "updated_at": datetime.now(timezone.utc)}}
             )
+            _invalidate_threshold(threshold_id)
             return result.modified_count > 0
         except Exception as e:
-            logger.error(f"Error deleting threshold: {e}")
+            logger.error("Error deleting threshold: %s", e)
             return False
     
     @staticmethod
     def get_all_thresholds() -> List[Dict]:
         """Get all active thresholds."""
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             return []
         
         try:
-            thresholds = list(db.thresholds.find({"is_active": True}))
+            thresholds = list(_thresholds_coll.find({"is_active": True}, THRESHOLD_FIELDS))
             for t in thresholds:
                 t["_id"] = str(t["_id"])
             return thresholds
         except Exception as e:
-            logger.error(f"Error fetching all thresholds: {e}")
+            logger.error("Error fetching all thresholds: %s", e)
             return []
 
 
 class SimulationComparator:
     """Compares simulation runs against thresholds."""
     
+    @staticmethod
+    def flush():
+        """Write any simulation runs and comparisons queued with buffered=True."""
+        flush_buffers(acknowledged=True)
+    
     @staticmethod
     def log_simulation_run(
         simulation_id: str,
@@ -221,7 +571,9 @@ class SimulationComparator:
         target_value: Optional[float] = None,
         min_value: Optional[float] = None,
         max_value: Optional[float] = None,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        buffered: bool = False,
+        timestamp: Optional[datetime] = None
     ) -> Optional[str]:
         """
         Log a simulation run against a threshold.
@@ -236,83 +588,84 @@ class SimulationComparator:
             min_value: Optional minimum acceptable value
             max_value: Optional maximum acceptable value
             metadata: Additional metadata about the run
+            buffered: Queue the write for a batched, unacknowledged bulk_write
+                      instead of inserting immediately (call flush() when done)
+            timestamp: UTC time to record; batch callers can pass one shared
+                       value instead of reading the clock per document
         
         Returns:
             ObjectId of logged run as string, or None on error
         """
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             logger.warning("MongoDB not available, simulation run not logged")
             return None
         
         try:
-            status = "on_target"
-            if min_value is not None and actual_value < min_value:
-                status = "below_min"
-            elif max_value is not None and actual_value > max_value:
-                status = "above_max"
-            elif target_value is not None:
-                tolerance = abs(target_value) * 0.1
-                if not (target_value - tolerance <= actual_value <= target_value + tolerance):
-                    status = "off_target"
+            status = _status_classifier(min_value, max_value, target_value)(actual_value)
             
-            run_doc = {
-                "simulation_id": simulation_id,
-                "threshold_id": threshold_id,
-                "agent_name": agent_name,
-                "kpi_name": kpi_name,
+            run_id = ObjectId()
+            prefix = _run_doc_prefix(simulation_id, threshold_id, agent_name, kpi_name,
+                                     target_value, min_value, max_value)
+            run_doc = _raw_run_doc(prefix, {
+                "_id": run_id,
                 "actual_value": actual_value,
-                "target_value": target_value,
-                "min_value": min_value,
-                "max_value": max_value,
                 "status": status,
-                "timestamp": datetime.utcnow(),
+                "timestamp": timestamp or datetime.now(timezone.utc),
                 "metadata": metadata or {}
-            }
+            })
             
-            result = db.simulation_runs.insert_one(run_doc)
-            return str(result.inserted_id)
+            if buffered:
+                _runs_buffer.add(run_doc)
+            else:
+                _runs_coll.insert_one(run_doc)
+            return str(run_id)
         
         except Exception as e:
-            logger.error(f"Error logging simulation run: {e}")
+            logger.error("Error logging simulation run: %s", e)
             return None
     
     @staticmethod
     def get_simulation_results(simulation_id: str) -> Dict:
         """Get all results for a specific simulation."""
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             return {}
         
+        # Acknowledged so the read below sees runs queued with buffered=True
+        _runs_buffer.flush(acknowledged=True)
+        
         try:
-            runs = list(db.simulation_runs.find({"simulation_id": simulation_id}))
+            cursor = _runs_coll.find(
+                {"simulation_id": simulation_id},
+                RUN_RESULT_FIELDS
+            ).batch_size(500)
             
-            for run in runs:
+            total = 0
+            passed = 0
+            runs = []
+            results_by_agent = {}
+            for run in cursor:
+                total += 1
+                if run["status"] == "on_target":
+                    passed += 1
+                
                 run["_id"] = str(run["_id"])
                 if "threshold_id" in run:
                     run["threshold_id"] = str(run["threshold_id"])
-            
-            results_by_agent = {}
-            for run in runs:
-                agent = run["agent_name"]
-                kpi = run["kpi_name"]
+                run["simulation_id"] = simulation_id
+                runs.append(run)
                 
-                if agent not in results_by_agent:
-                    results_by_agent[agent] = {}
-                if kpi not in results_by_agent[agent]:
-                    results_by_agent[agent][kpi] = []
-                
-                results_by_agent[agent][kpi].append({
+                kpi_results = results_by_agent.setdefault(run["agent_name"], {}).setdefault(run["kpi_name"], [])
+                kpi_results.append({
                     "actual": run["actual_value"],
-                    "target": run["target_value"],
+                    "target": run.get("target_value"),
                     "status": run["status"],
                     "timestamp": run["timestamp"].isoformat()
                 })
             
             summary = {
-                "total_runs": len(runs),
-                "passed": len([r for r in runs if r["status"] == "on_target"]),
-                "failed": len([r for r in runs if r["status"] != "on_target"]),
+                "total_runs": total,
+                "passed": passed,
+                "failed": total - passed,
                 "by_agent": results_by_agent,
                 "runs": runs
             }
@@ -320,7 +673,7 @@ class SimulationComparator:
             return summary
         
         except Exception as e:
-            logger.error(f"Error fetching simulation results: {e}")
+            logger.error("Error fetching simulation results: %s", e)
             return {}
     
     @staticmethod
@@ -331,15 +684,17 @@ class SimulationComparator:
         actual_value: float,
         threshold_min: Optional[float] = None,
         threshold_max: Optional[float] = None,
-        notes: str = ""
+        notes: str = "",
+        buffered: bool = False,
+        timestamp: Optional[datetime] = None
     ) -> Optional[str]:
-        """Log a comparison result."""
-        db = init_mongodb()
-        if db is None:
+        """Log a comparison result (optionally queued for a batched write)."""
+        if _db is None and init_mongodb() is None:
             return None
         
         try:
             comparison_doc = {
+                "_id": ObjectId(),
                 "simulation_id": simulation_id,
                 "threshold_id": threshold_id,
                 "is_within_threshold": is_within_threshold,
@@ -347,36 +702,42 @@ class SimulationComparator:
                 "threshold_min": threshold_min,
                 "threshold_max": threshold_max,
                 "notes": notes,
-                "timestamp": datetime.utcnow()
+                "timestamp": timestamp or datetime.now(timezone.utc)
             }
             
-            result = db.comparisons.insert_one(comparison_doc)
-            return str(result.inserted_id)
+            if buffered:
+                _comparisons_buffer.add(comparison_doc)
+            else:
+                _comparisons_coll.insert_one(comparison_doc)
+            return str(comparison_doc["_id"])
         
         except Exception as e:
-            logger.error(f"Error logging comparison: {e}")
+            logger.error("Error logging comparison: %s", e)
             return None
     
     @staticmethod
     def get_comparison_history(threshold_id: str, limit: int = 100) -> List[Dict]:
         """Get comparison history for a threshold."""
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             return []
         
+        _comparisons_buffer.flush(acknowledged=True)
+        
         try:
-            comparisons = list(db.comparisons.find(
-                {"threshold_id": threshold_id}
+            comparisons = list(_comparisons_coll.find(
+                {"threshold_id": threshold_id},
+                COMPARISON_FIELDS
             ).sort("timestamp", -1).limit(limit))
             
+            # threshold_id is the filter value, so it is not fetched back
             for comp in comparisons:
                 comp["_id"] = str(comp["_id"])
-                comp["threshold_id"] = str(comp["threshold_id"])
+                comp["threshold_id"] = threshold_id
             
             return comparisons
         
         except Exception as e:
-            logger.error(f"Error fetching comparison history: {e}")
+            logger.error("Error fetching comparison history: %s", e)
             return []
     
     @staticmethod
@@ -386,18 +747,34 @@ class SimulationComparator:
         days: int = 30
     ) -> Dict:
         """Get statistics on threshold compliance."""
-        db = init_mongodb()
-        if db is None:
+        if _db is None and init_mongodb() is None:
             return {}
         
+        _runs_buffer.flush(acknowledged=True)
+        
         try:
-            runs = list(db.simulation_runs.find())
+            match = {"timestamp": {"$gte": datetime.now(timezone.utc) - timedelta(days=days)}}
+            if threshold_id:
+                match["threshold_id"] = threshold_id
+            if agent_name:
+                match["agent_name"] = agent_name
+            
+            pipeline = [
+                {"$match": match},
+                {"$project": {"_id": 0, "status": 1}},
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "passed": {"$sum": {"$cond": [{"$eq": ["$status", "on_target"]}, 1, 0]}}
+                }}
+            ]
+            counts = next(_runs_coll.aggregate(pipeline), None)
             
-            if not runs:
+            if not counts or not counts["total"]:
                 return {"total": 0, "passed": 0, "failed": 0, "pass_rate": 0}
             
-            total = len(runs)
-            passed = len([r for r in runs if r["status"] == "on_target"])
+            total = counts["total"]
+            passed = counts["passed"]
             failed = total - passed
             
             return {
@@ -411,5 +788,5 @@ class SimulationComparator:
             }
         
         except Exception as e:
-            logger.error(f"Error calculating statistics: {e}")
+            logger.error("Error calculating statistics: %s", e)
             return {}
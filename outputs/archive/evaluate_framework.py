@@ -14,14 +14,40 @@ Requires: numpy, pandas, matplotlib
 import os
 import time
 import json
+import hashlib
+import warnings
 from typing import List, Dict
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 from multi_agent_demo_mock import ExecutiveBot, BoardRoom, generate_mock_runs
 
 OUTPUT_DIR = "outputs"
+CACHE_DIR = os.path.join(OUTPUT_DIR, "_cache")
 
 CFO = ExecutiveBot(
     "CFO",
@@ -44,12 +70,65 @@ COO = ExecutiveBot(
 
 BOARD = BoardRoom([CFO, CRO, COO])
 
+CATEGORIES = ["increase", "maintain", "decrease"]
+KPI_COLUMNS = ("accumulated_profit", "compromised_systems", "systems_availability")
+
+plt.rcParams["path.simplify"] = True
+plt.rcParams["path.simplify_threshold"] = 1.0
+
 
 def ensure_output_dir():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
+def _cache_path(path: str) -> str:
+    """Parquet cache location for one version (path + mtime) of a source file."""
+    key = hashlib.sha1(f"{path}:{os.path.getmtime(path)}".encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
+
+
+def _nanmedian(values: np.ndarray) -> float:
+    if bn is not None:
+        return bn.nanmedian(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(values)
+
+
+def _normalize_kpis(df: pd.DataFrame) -> pd.DataFrame:
+    present = [c for c in KPI_COLUMNS if c in df.columns]
+    if present:
+        df[present] = df[present].apply(pd.to_numeric, errors="coerce")
+    if "systems_availability" in df.columns:
+        avail = df["systems_availability"].to_numpy(np.float64, na_value=np.nan, copy=True)
+        # an all-NaN median is NaN, which fails the > 1 check on its own
+        if avail.size and _nanmedian(avail) > 1:
+            np.divide(avail, 100.0, out=avail)
+        df["systems_availability"] = avail
+    return df
+
+
+def _read_kpi_records(path: str) -> pd.DataFrame:
+    """Stream a JSON array or id-keyed object of runs, keeping only the KPI fields."""
+    with open(path, "rb") as f:
+        if ijson is None:
+            raw = _loads(f.read())
+            records = raw.values() if isinstance(raw, dict) else raw
+        else:
+            is_array = f.read(64).lstrip()[:1] == b"["
+            f.seek(0)
+            if is_array:
+                records = ijson.items(f, "item", use_float=True)
+            else:
+                records = (run for _, run in ijson.kvitems(f, "", use_float=True))
+        return pd.DataFrame([{k: run[k] for k in KPI_COLUMNS if k in run} for run in records])
+
+
 def load_dataset() -> pd.DataFrame:
+    """Load and normalize the first available dataset.
+    Parsed datasets are cached as Parquet (needs pyarrow) keyed by the source
+    file's mtime, so repeat runs skip the JSON decode and coercion.
+    """
     candidates = [
         "automated_dataset.json",
         "automated_simulation_data.json",
@@ -57,31 +136,25 @@ def load_dataset() -> pd.DataFrame:
     ]
     for path in candidates:
         if os.path.exists(path):
+            cache_path = _cache_path(path)
+            if os.path.exists(cache_path):
+                try:
+                    return pd.read_parquet(cache_path)
+                except Exception:
+                    pass
             try:
-                with open(path, "r") as f:
-                    raw = json.load(f)
-                if isinstance(raw, dict):
-                    data = list(raw.values())
-                else:
-                    data = raw
-                df = pd.DataFrame(data)
-                break
+                df = _normalize_kpis(_read_kpi_records(path))
             except Exception:
                 continue
-    else:
-        data = generate_mock_runs(50)
-        df = pd.DataFrame(data)
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                df.to_parquet(cache_path, engine="pyarrow", compression="zstd")
+            except Exception:
+                pass
+            return df
 
-    if "accumulated_profit" in df.columns:
-        df["accumulated_profit"] = pd.to_numeric(df["accumulated_profit"], errors="coerce")
-    if "compromised_systems" in df.columns:
-        df["compromised_systems"] = pd.to_numeric(df["compromised_systems"], errors="coerce")
-    if "systems_availability" in df.columns:
-        avail = pd.to_numeric(df["systems_availability"], errors="coerce")
-        if avail.notna().any() and np.nanmedian(avail) > 1:
-            avail = avail / 100.0
-        df["systems_availability"] = avail
-    return df
+    data = generate_mock_runs(50)
+    return _normalize_kpis(pd.DataFrame(data))
 
 
 def classify_recommendation(bot: ExecutiveBot, run: Dict) -> str:
@@ -98,67 +171,136 @@ def classify_recommendation(bot: ExecutiveBot, run: Dict) -> str:
     return "maintain"
 
 
+def kpi_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Extract each KPI column once as float64 (None when the column is absent)."""
+    return {
+        col: df[col].to_numpy(np.float64, copy=False) if col in df.columns else None
+        for col in KPI_COLUMNS
+    }
+
+
+def classify_column(bot: ExecutiveBot, arrays: Dict[str, np.ndarray], n: int) -> np.ndarray:
+    """Vectorized classify_recommendation over all n runs.
+    Returns indices into CATEGORIES, with len(CATEGORIES) marking "unknown".
+    """
+    kpi = arrays.get(bot.kpi_focus)
+    if kpi is None:
+        return np.full(n, len(CATEGORIES), dtype=np.intp)
+    tmin = bot.target.get("min", -np.inf)
+    tmax = bot.target.get("max", np.inf)
+    return np.where(kpi < tmin, 0, np.where(kpi > tmax, 2, 1))
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fleiss_core(mat):
+        """Fused pass returning (P_bar, per-category proportions)."""
+        N, k = mat.shape
+        n = mat[0].sum()
+        sumP = 0.0
+        for i in prange(N):
+            s2 = 0.0
+            for j in range(k):
+                s2 += mat[i, j] * mat[i, j]
+            sumP += (s2 - n) / (n * (n - 1))
+        cat = np.zeros(k)
+        for i in range(N):
+            for j in range(k):
+                cat[j] += mat[i, j]
+        return sumP / N, cat / (N * n)
+else:
+    _fleiss_core = None
+
+
 def fleiss_kappa(matrix: np.ndarray) -> float:
     """Compute Fleiss' kappa for multiple raters and categories.
     matrix: N x k where N items, k categories, entries are counts of raters per category.
+    Uses a fused Numba kernel when numba is installed.
+    """
+    if _fleiss_core is not None:
+        P_bar, p = _fleiss_core(np.ascontiguousarray(matrix, dtype=np.float64))
+    else:
+        N, k = matrix.shape
+        n = np.sum(matrix[0])  # raters per item (assumed constant)
+        p = np.sum(matrix, axis=0) / (N * n)
+        P = (np.sum(matrix * matrix, axis=1) - n) / (n * (n - 1))
+        P_bar = np.mean(P)
+    P_e = np.sum(p * p)
+    if np.isclose(1 - P_e, 0):
+        return 0.0
+    return float((P_bar - P_e) / (1 - P_e))
+
+
+def fleiss_kappa_from_labels(labels: np.ndarray, k: int = len(CATEGORIES)) -> float:
+    """Fleiss' kappa straight from an N x n array of category indices (k = unknown).
+    For n = 3 raters the per-item agreement is read from a histogram of the
+    (k+1)^3 possible label triples, so no N x k count matrix is built.
     """
-    N, k = matrix.shape
-    n = np.sum(matrix[0])  # raters per item (assumed constant)
-    p = np.sum(matrix, axis=0) / (N * n)
-    P = (np.sum(matrix * matrix, axis=1) - n) / (n * (n - 1))
-    P_bar = np.mean(P)
+    N, n = labels.shape
+    if n != 3:
+        M = np.stack([(labels == c).sum(axis=1) for c in range(k)], axis=1).astype(float)
+        return fleiss_kappa(M)
+
+    base = k + 1
+    codes = labels[:, 0] * base * base + labels[:, 1] * base + labels[:, 2]
+    hist = np.bincount(codes, minlength=base ** n)
+
+    # Sum of squared per-category rater counts for every possible triple
+    digits = (np.arange(base ** n)[:, None] // base ** np.arange(n)) % base
+    sumsq = sum((digits == c).sum(axis=1) ** 2 for c in range(k))
+
+    raters = int(np.count_nonzero(labels[0] < k))  # raters per item (assumed constant)
+    p = np.bincount(labels.ravel(), minlength=base)[:k] / (N * raters)
+    P_bar = (np.dot(hist, sumsq) / N - raters) / (raters * (raters - 1))
     P_e = np.sum(p * p)
     if np.isclose(1 - P_e, 0):
         return 0.0
     return float((P_bar - P_e) / (1 - P_e))
 
 
-def evaluate_and_figure(df: pd.DataFrame):
+def hist_bars(ax, values, color: str, bins: int = 20):
+    """Draw a histogram from precomputed np.histogram counts as rasterized bars."""
+    counts, edges = np.histogram(values, bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge",
+           color=color, alpha=0.7, rasterized=True)
+
+
+def evaluate_and_figure(arrays: Dict[str, np.ndarray], n_runs: int):
+    """Evaluate agents and render figures from KPI arrays (see kpi_arrays)."""
     ensure_output_dir()
 
     start = time.time()
-    labels = []  # per-run, per-agent recommendation labels
-    for _, row in df.iterrows():
-        run = row.to_dict()
-        run_labels = [
-            classify_recommendation(CFO, run),
-            classify_recommendation(CRO, run),
-            classify_recommendation(COO, run),
-        ]
-        labels.append(run_labels)
+    agents = {"CFO": CFO, "CRO": CRO, "COO": COO}
+    # N x 3 per-run, per-agent recommendation label indices
+    labels = np.stack([classify_column(agent, arrays, n_runs) for agent in agents.values()], axis=1)
     elapsed = time.time() - start
-    avg_ms_per_run = (elapsed / max(len(df), 1)) * 1000
-
-    cats = ["increase", "maintain", "decrease"]
-    mat = []
-    for lab3 in labels:
-        counts = [lab3.count(c) for c in cats]
-        mat.append(counts)
-    M = np.array(mat, dtype=float) if mat else np.zeros((0, 3))
-    kappa = fleiss_kappa(M) if len(M) else 0.0
-
-    dist = {"CFO": {}, "CRO": {}, "COO": {}}
-    for agent, name in zip([CFO, CRO, COO], ["CFO", "CRO", "COO"]):
-        counts = {c: 0 for c in cats}
-        for _, row in df.iterrows():
-            lab = classify_recommendation(agent, row.to_dict())
-            if lab in counts:
-                counts[lab] += 1
-        dist[name] = counts
+    avg_ms_per_run = (elapsed / max(n_runs, 1)) * 1000
+
+    cats = CATEGORIES
+    kappa = fleiss_kappa_from_labels(labels) if len(labels) else 0.0
+
+    # agents x categories recommendation counts, reused by the bar chart below
+    rec_counts = np.stack([
+        np.bincount(labels[:, j], minlength=len(cats) + 1)[:len(cats)]
+        for j in range(len(agents))
+    ])
 
     fig, axes = plt.subplots(1, 3, figsize=(14, 4))
-    if "accumulated_profit" in df.columns:
-        axes[0].hist(df["accumulated_profit"].dropna(), bins=20, color="#60a5fa", alpha=0.7)
+    if arrays["accumulated_profit"] is not None:
+        values = arrays["accumulated_profit"]
+        hist_bars(axes[0], values[~np.isnan(values)], "#60a5fa")
         axes[0].axvline(CFO.target["min"], color="#1d4ed8", linestyle="--", label="Target")
         axes[0].set_title("Profit Distribution")
         axes[0].legend()
-    if "compromised_systems" in df.columns:
-        axes[1].hist(df["compromised_systems"].dropna(), bins=20, color="#f59e0b", alpha=0.7)
+    if arrays["compromised_systems"] is not None:
+        values = arrays["compromised_systems"]
+        hist_bars(axes[1], values[~np.isnan(values)], "#f59e0b")
         axes[1].axvline(CRO.target["max"], color="#b91c1c", linestyle="--", label="Cap")
         axes[1].set_title("Compromised Systems")
         axes[1].legend()
-    if "systems_availability" in df.columns:
-        axes[2].hist(df["systems_availability"].dropna(), bins=20, color="#10b981", alpha=0.7)
+    if arrays["systems_availability"] is not None:
+        values = arrays["systems_availability"]
+        hist_bars(axes[2], values[~np.isnan(values)], "#10b981")
         axes[2].axvline(COO.target["min"], color="#065f46", linestyle="--", label="SLO")
         axes[2].set_title("Availability")
         axes[2].legend()
@@ -171,12 +313,8 @@ def evaluate_and_figure(df: pd.DataFrame):
     fig, ax = plt.subplots(figsize=(6, 4))
     idx = np.arange(3)
     width = 0.25
-    cfo_counts = [dist["CFO"].get(c, 0) for c in cats]
-    cro_counts = [dist["CRO"].get(c, 0) for c in cats]
-    coo_counts = [dist["COO"].get(c, 0) for c in cats]
-    ax.bar(idx - width, cfo_counts, width, label="CFO")
-    ax.bar(idx, cro_counts, width, label="CRO")
-    ax.bar(idx + width, coo_counts, width, label="COO")
+    for offset, name, counts in zip((-width, 0, width), agents, rec_counts):
+        ax.bar(idx + offset, counts, width, label=name)
     ax.set_xticks(idx)
     ax.set_xticklabels(cats)
     ax.set_ylabel("Count")
@@ -188,11 +326,11 @@ def evaluate_and_figure(df: pd.DataFrame):
     plt.close()
 
     # 3) Risk-reward scatter: Profit vs. Compromised (if available)
-    if "accumulated_profit" in df.columns and "compromised_systems" in df.columns:
+    x = arrays["accumulated_profit"]
+    y = arrays["compromised_systems"]
+    if x is not None and y is not None:
         plt.figure(figsize=(5, 4))
-        x = df["accumulated_profit"].astype(float)
-        y = df["compromised_systems"].astype(float)
-        plt.scatter(x, y, alpha=0.6, s=20, c="#6366f1")
+        plt.scatter(x, y, alpha=0.6, s=20, c="#6366f1", marker=".", rasterized=True)
         plt.axvline(CFO.target["min"], color="#1d4ed8", linestyle="--")
         plt.axhline(CRO.target["max"], color="#b91c1c", linestyle="--")
         plt.xlabel("Profit ($)")
@@ -209,7 +347,7 @@ def evaluate_and_figure(df: pd.DataFrame):
     md = [
         "# Framework Evaluation Summary",
         "",
-        f"- Runs evaluated: {len(df)}",
+        f"- Runs evaluated: {n_runs}",
         f"- Avg eval time per run: {avg_ms_per_run:.2f} ms",
         f"- Fleiss' kappa (3 agents, 3 categories): {kappa:.2f}",
         "",
@@ -224,10 +362,10 @@ def evaluate_and_figure(df: pd.DataFrame):
         f.write("\n".join(md))
 
     print("✅ Evaluation complete")
-    print(f"Runs: {len(df)} | Avg eval (ms/run): {avg_ms_per_run:.2f} | Kappa: {kappa:.2f}")
+    print(f"Runs: {n_runs} | Avg eval (ms/run): {avg_ms_per_run:.2f} | Kappa: {kappa:.2f}")
     print("Figures saved in outputs/")
 
 
 if __name__ == "__main__":
     df = load_dataset()
-    evaluate_and_figure(df)
+    evaluate_and_figure(kpi_arrays(df), len(df))
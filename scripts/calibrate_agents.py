@@ -3,69 +3,231 @@ Agent Calibration Tool
 Analyzes actual simulation data to recommend optimal agent targets and personalities.
 """
 
+import os
+import sys
+import copy
 import json
-import statistics
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from forio_data_extractor import ForioDataExtractor
 from multi_agent_demo_mock import generate_mock_runs
 
-def analyze_data_distribution(runs, variables):
-    """Analyze the distribution of KPI values across runs."""
+CACHE_DIR = os.path.join('outputs', '_cache')
+# Bump when analyze_data_distribution's output changes so stale caches are ignored
+CACHE_VERSION = 1
+
+# Shared stand-in for runs without Forio variables; never mutated
+EMPTY_DICT = {}
+
+# KPI columns read by recommend_targets
+TARGET_KPIS = ('accumulated_profit', 'compromised_systems', 'systems_availability')
+# (columns digest, percentile) -> recommendations, least recently used first
+_targets_cache = OrderedDict()
+TARGETS_CACHE_SIZE = 64
+
+
+def fetch_runs_parallel(extractor, variables, total, chunk=25, workers=4):
+    """
+    Fetch `total` runs as concurrent windows of `chunk` records.
+    
+    Each window is fetched on its own thread and retried once on failure;
+    results are merged in record order. Record bounds are inclusive, as in
+    the Forio startRecord/endRecord parameters.
+    """
+    windows = [(start, min(start + chunk, total) - 1) for start in range(0, total, chunk)]
+    
+    def fetch(window):
+        start, end = window
+        return extractor.fetch_runs_with_variables(
+            variables=variables,
+            start_record=start,
+            end_record=end
+        )
+    
+    results = {}
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch, window): window for window in windows}
+        for future in as_completed(futures):
+            window = futures[future]
+            try:
+                results[window] = future.result()
+            except Exception:
+                failed.append(window)
+        
+        retries = {executor.submit(fetch, window): window for window in failed}
+        for future in as_completed(retries):
+            window = retries[future]
+            try:
+                results[window] = future.result()
+            except Exception as e:
+                print(f"Failed to fetch runs {window[0]}-{window[1]}: {e}")
+    
+    runs = []
+    for window in windows:
+        runs.extend(results.get(window) or [])
+    return runs
+
+
+def _kpi_row(run, variables):
+    """KPI values for one run, falling back to the run's Forio variables (None if missing)."""
+    get = run.get
+    forio_get = (run.get('variables') or EMPTY_DICT).get
+    return [val if (val := get(var)) is not None else forio_get(var) for var in variables]
+
+
+def to_columns(runs, variables, nested=True):
+    """
+    Convert a list of run dicts into columnar form: one float64 array per
+    variable, aligned by run index, with NaN for missing values.
+    
+    With nested=False only top-level keys are read, as ExecutiveBot.evaluate does.
+    """
+    variables = list(variables)
+    if nested:
+        rows = [_kpi_row(run, variables) for run in runs]
+    else:
+        rows = [[run.get(var) for var in variables] for run in runs]
+    # One pass over the runs; float64 conversion maps None to NaN
+    matrix = np.array(rows, dtype=np.float64)
+    matrix = matrix.reshape(len(runs), len(variables)).T.copy()
+    return dict(zip(variables, matrix))
+
+
+def analyze_data_distribution(columns):
+    """Analyze the distribution of KPI values across runs (columnar input, see to_columns)."""
     analysis = {}
     
-    for var in variables:
-        values = []
-        for run in runs:
-            val = run.get(var)
-            if val is None and 'variables' in run:
-                val = run['variables'].get(var)
-            if val is not None:
-                values.append(val)
+    for var, values in columns.items():
+        count = int(np.count_nonzero(~np.isnan(values)))
         
-        if values:
+        if count:
             analysis[var] = {
-                'min': min(values),
-                'max': max(values),
-                'mean': statistics.mean(values),
-                'median': statistics.median(values),
-                'stdev': statistics.stdev(values) if len(values) > 1 else 0,
-                'count': len(values)
+                'min': np.nanmin(values).item(),
+                'max': np.nanmax(values).item(),
+                'mean': np.nanmean(values).item(),
+                'median': np.nanmedian(values).item(),
+                'stdev': np.nanstd(values, ddof=1).item() if count > 1 else 0,
+                'count': count
             }
     
     return analysis
 
 
-def recommend_targets(analysis, percentile=0.7):
+def _runs_digest(runs):
+    """Content hash of the fetched runs (plus CACHE_VERSION) used as the cache key."""
+    payload = json.dumps([CACHE_VERSION, runs], sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def load_cached_analysis(digest):
+    """Return a previously pickled analysis for these runs, or None."""
+    try:
+        with open(os.path.join(CACHE_DIR, f"calib_{digest}.pkl"), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def save_cached_analysis(digest, analysis):
+    """Atomically pickle an analysis under CACHE_DIR."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=".calib-")
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(analysis, f)
+        os.replace(tmp_path, os.path.join(CACHE_DIR, f"calib_{digest}.pkl"))
+    except OSError as e:
+        print(f"Warning: Could not cache analysis: {e}")
+
+
+def _analysis_key(analysis):
+    """Hashable snapshot of an analysis dict, used to memoize recommendations."""
+    return tuple(sorted((var, tuple(sorted(stats.items()))) for var, stats in analysis.items()))
+
+
+def _thaw(key):
+    return {var: dict(stats) for var, stats in key}
+
+
+def _columns_key(columns):
+    """Content digest of the KPI columns recommend_targets reads, used to memoize it."""
+    h = hashlib.blake2b(digest_size=16)
+    for kpi in TARGET_KPIS:
+        values = columns.get(kpi)
+        h.update(kpi.encode())
+        if values is None:
+            h.update(b'\0')
+        else:
+            h.update(b'\1')
+            h.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _observed(columns, kpi):
+    values = columns.get(kpi)
+    if values is None:
+        return None
+    values = values[~np.isnan(values)]
+    return values if values.size else None
+
+
+def recommend_targets(columns, percentile=0.7):
     """
     Recommend agent targets based on data distribution.
     
     Args:
-        analysis: Data distribution analysis
+        columns: Columnar KPI arrays (see to_columns)
         percentile: Target percentile (0.7 = aim for top 30%)
     """
+    key = (_columns_key(columns), percentile)
+    cached = _targets_cache.get(key)
+    if cached is None:
+        cached = _targets_cache[key] = _recommend_targets(columns, percentile)
+        if len(_targets_cache) > TARGETS_CACHE_SIZE:
+            _targets_cache.popitem(last=False)
+    else:
+        _targets_cache.move_to_end(key)
+    return copy.deepcopy(cached)
+
+
+def _recommend_targets(columns, percentile):
     recommendations = {}
     
-    if 'accumulated_profit' in analysis:
-        stats = analysis['accumulated_profit']
-        target = stats['mean'] + (0.5 * stats['stdev'])
+    profit = _observed(columns, 'accumulated_profit')
+    if profit is not None:
+        target = float(np.quantile(profit, percentile))
         recommendations['CFO'] = {
             'target': {'min': round(target, -3)},  # Round to nearest 1000
-            'rationale': f"Based on mean ${stats['mean']:,.0f} + 0.5 stdev"
+            'rationale': f"{percentile:.0%} percentile of profit (${target:,.0f})"
         }
     
-    if 'compromised_systems' in analysis:
-        stats = analysis['compromised_systems']
-        target = stats['mean'] - (0.5 * stats['stdev'])
+    compromised = _observed(columns, 'compromised_systems')
+    if compromised is not None:
+        # Fewer compromised systems is better, so aim at the low tail
+        target = float(np.quantile(compromised, 1 - percentile))
         recommendations['CRO'] = {
             'target': {'max': max(0, round(target))},
-            'rationale': f"Based on mean {stats['mean']:.1f} - 0.5 stdev"
+            'rationale': f"{1 - percentile:.0%} percentile of compromised systems ({target:.1f})"
         }
     
-    if 'systems_availability' in analysis:
-        stats = analysis['systems_availability']
-        target = stats['mean'] + (0.3 * stats['stdev'])
+    availability = _observed(columns, 'systems_availability')
+    if availability is not None:
+        target = float(np.quantile(availability, percentile))
         recommendations['COO'] = {
             'target': {'min': round(target, 2)},
-            'rationale': f"Based on mean {stats['mean']:.2%} + 0.3 stdev"
+            'rationale': f"{percentile:.0%} percentile of availability ({target:.2%})"
         }
     
     return recommendations
@@ -75,6 +237,12 @@ def recommend_personalities(analysis):
     """
     Recommend personality traits based on data characteristics.
     """
+    return copy.deepcopy(_recommend_personalities_cached(_analysis_key(analysis)))
+
+
+@lru_cache(maxsize=64)
+def _recommend_personalities_cached(key):
+    analysis = _thaw(key)
     recommendations = {}
     
     if 'accumulated_profit' in analysis:
@@ -116,50 +284,118 @@ def recommend_personalities(analysis):
     return recommendations
 
 
-def test_calibration(runs, targets, personalities):
-    """
-    Test how agents would perform with new calibration.
-    Returns distribution of agent responses.
+AGENT_KPIS = {
+    'CFO': 'accumulated_profit',
+    'CRO': 'compromised_systems',
+    'COO': 'systems_availability'
+}
+
+
+class CalibrationEvaluator:
     """
-    from multi_agent_demo_mock import ExecutiveBot, BoardRoom
-    
-    cfo = ExecutiveBot("CFO", "accumulated_profit", 
-                       target=targets.get('CFO', {}).get('target', {}),
-                       personality=personalities.get('CFO', {}))
+    Scores candidate targets against a fixed set of runs.
     
-    cro = ExecutiveBot("CRO", "compromised_systems",
-                       target=targets.get('CRO', {}).get('target', {}),
-                       personality=personalities.get('CRO', {}))
+    Each agent's KPI column is sorted once up front, so evaluating a target
+    is two binary searches per agent regardless of the number of runs, which
+    keeps grid searches over many candidate targets cheap.
+    """
     
-    coo = ExecutiveBot("COO", "systems_availability",
-                       target=targets.get('COO', {}).get('target', {}),
-                       personality=personalities.get('COO', {}))
+    IDEAL_DISTRIBUTION = np.array([0.3, 0.4, 0.3])  # below, on, above
+    
+    def __init__(self, columns):
+        self.sizes = {}
+        self.sorted_values = {}
+        for kpi in AGENT_KPIS.values():
+            values = columns[kpi]
+            self.sizes[kpi] = values.size
+            self.sorted_values[kpi] = np.sort(values[~np.isnan(values)])
+    
+    def evaluate(self, targets):
+        """
+        Count below/on/above target evaluations for every agent, the same way
+        ExecutiveBot.evaluate classifies; runs missing the KPI count as on target.
+        """
+        results = {
+            'below_target': 0,
+            'on_target': 0,
+            'above_target': 0
+        }
+        
+        for agent, kpi in AGENT_KPIS.items():
+            values = self.sorted_values[kpi]
+            target = targets.get(agent, {}).get('target', {})
+            tmin = target.get('min', -np.inf)
+            tmax = target.get('max', np.inf)
+            
+            n_below = int(np.searchsorted(values, tmin, side='left'))
+            # "above" only applies to values that are not already below
+            if tmax >= tmin:
+                n_above = values.size - int(np.searchsorted(values, tmax, side='right'))
+            else:
+                n_above = values.size - n_below
+            
+            results['below_target'] += n_below
+            results['above_target'] += n_above
+            results['on_target'] += self.sizes[kpi] - n_below - n_above
+        
+        total = sum(results.values())
+        return {
+            'below_target_pct': results['below_target'] / total if total > 0 else 0,
+            'on_target_pct': results['on_target'] / total if total > 0 else 0,
+            'above_target_pct': results['above_target'] / total if total > 0 else 0,
+            'total_evaluations': total
+        }
     
-    board = BoardRoom([cfo, cro, coo])
+    def grid_search(self, percentiles=np.linspace(0.5, 0.9, 9)):
+        """
+        Sweep recommend_targets over `percentiles` and return the candidate whose
+        distribution is closest (KL divergence) to IDEAL_DISTRIBUTION.
+        """
+        best = None
+        for percentile in percentiles:
+            percentile = round(float(percentile), 4)
+            targets = recommend_targets(self.sorted_values, percentile)
+            results = self.evaluate(targets)
+            observed = np.array([
+                results['below_target_pct'],
+                results['on_target_pct'],
+                results['above_target_pct']
+            ])
+            ideal = self.IDEAL_DISTRIBUTION
+            divergence = float(np.sum(ideal * np.log(ideal / np.maximum(observed, 1e-9))))
+            
+            if best is None or divergence < best['kl_divergence']:
+                best = {
+                    'percentile': percentile,
+                    'targets': targets,
+                    'results': results,
+                    'kl_divergence': divergence
+                }
+        return best
+
+
+def test_calibration(columns, targets):
+    """
+    Test how agents would perform with new calibration.
+    Returns distribution of agent responses.
     
-    results = {
-        'below_target': 0,
-        'on_target': 0,
-        'above_target': 0
-    }
+    Args:
+        columns: Top-level KPI columns (see to_columns with nested=False)
+    """
+    return CalibrationEvaluator(columns).evaluate(targets)
+
+
+def run_sample_meeting(run, targets, personalities):
+    """End-to-end sanity check: let the calibrated bots comment on one run."""
+    from multi_agent_demo_mock import ExecutiveBot, BoardRoom
     
-    for run in runs:
-        feedback = board.run_meeting(run)
-        for comment in feedback:
-            if 'below target' in comment:
-                results['below_target'] += 1
-            elif 'above target' in comment:
-                results['above_target'] += 1
-            else:
-                results['on_target'] += 1
-    
-    total = sum(results.values())
-    return {
-        'below_target_pct': results['below_target'] / total if total > 0 else 0,
-        'on_target_pct': results['on_target'] / total if total > 0 else 0,
-        'above_target_pct': results['above_target'] / total if total > 0 else 0,
-        'total_evaluations': total
-    }
+    bots = [
+        ExecutiveBot(agent, kpi,
+                     target=targets.get(agent, {}).get('target', {}),
+                     personality=personalities.get(agent, {}))
+        for agent, kpi in AGENT_KPIS.items()
+    ]
+    return BoardRoom(bots).run_meeting(run)
 
 
 if __name__ == '__main__':
@@ -170,11 +406,11 @@ if __name__ == '__main__':
     print("\nFetching simulation data...")
     try:
         extractor = ForioDataExtractor()
-        runs = extractor.fetch_runs_with_variables(
+        runs = fetch_runs_parallel(
+            extractor,
             variables=['accumulated_profit', 'compromised_systems', 'systems_availability',
                       'prevention_budget', 'detection_budget', 'response_budget'],
-            start_record=0,
-            end_record=50
+            total=50
         )
         
         has_data = any(run.get('variables') for run in runs)
@@ -189,8 +425,15 @@ if __name__ == '__main__':
         runs = generate_mock_runs(20)
     
     print("\nAnalyzing data distribution...")
-    variables = ['accumulated_profit', 'compromised_systems', 'systems_availability']
-    analysis = analyze_data_distribution(runs, variables)
+    variables = list(AGENT_KPIS.values())
+    columns = to_columns(runs, variables)
+    digest = _runs_digest(runs)
+    analysis = load_cached_analysis(digest)
+    if analysis is None:
+        analysis = analyze_data_distribution(columns)
+        save_cached_analysis(digest, analysis)
+    else:
+        print("   (reusing cached analysis for identical runs)")
     
     print("\nData Statistics:")
     for var, stats in analysis.items():
@@ -201,7 +444,7 @@ if __name__ == '__main__':
         print(f"      Std Dev: {stats['stdev']:,.2f}")
     
     print("\nRecommending agent targets...")
-    target_recommendations = recommend_targets(analysis)
+    target_recommendations = recommend_targets(columns)
     
     print("\nRecommended Targets:")
     for agent, rec in target_recommendations.items():
@@ -221,7 +464,9 @@ if __name__ == '__main__':
         print(f"      Rationale: {rec['rationale']}")
     
     print("\nTesting calibration...")
-    test_results = test_calibration(runs, target_recommendations, personality_recommendations)
+    # Bots read only top-level KPIs, so runs with a KPI only under 'variables' count as on target
+    evaluator = CalibrationEvaluator(to_columns(runs, variables, nested=False))
+    test_results = evaluator.evaluate(target_recommendations)
     
     print("\nCalibration Test Results:")
     print(f"      Below Target: {test_results['below_target_pct']:.1%}")
@@ -229,6 +474,16 @@ if __name__ == '__main__':
     print(f"      Above Target: {test_results['above_target_pct']:.1%}")
     print(f"\nIdeal distribution: ~30% below, ~40% on, ~30% above")
     
+    best = evaluator.grid_search()
+    if best:
+        print(f"\nBest target percentile: {best['percentile']:.2f} "
+              f"(KL divergence from ideal: {best['kl_divergence']:.3f})")
+    
+    if '--verbose' in sys.argv and runs:
+        print("\nSample meeting on the first run:")
+        for comment in run_sample_meeting(runs[0], target_recommendations, personality_recommendations):
+            print(f"      {comment}")
+    
     print("\nGenerating configuration...")
     config = {
         'agents': {
@@ -255,8 +510,12 @@ if __name__ == '__main__':
         }
     }
     
-    with open('agent_calibration.json', 'w') as f:
-        json.dump(config, f, indent=2)
+    if orjson is not None:
+        with open('agent_calibration.json', 'wb') as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open('agent_calibration.json', 'w') as f:
+            json.dump(config, f, indent=2)
     
     print("Saved to agent_calibration.json")
     
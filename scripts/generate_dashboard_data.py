@@ -4,10 +4,19 @@ Creates realistic simulation runs with F1-F4 inputs and all outputs.
 """
 
 import json
-import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import numpy as np
 from data.forio_data_api import ForioDataAPI
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Concurrent per-run Data API saves
+SAVE_WORKERS = 8
+
 def generate_realistic_runs(n=10):
     """Generate realistic simulation runs with F1-F4 and all outputs."""
     runs = []
@@ -27,29 +36,55 @@ def generate_realistic_runs(n=10):
     
     base_time = datetime.now() - timedelta(days=30)
     
-    for i, strategy in enumerate(strategies[:n]):
+    # Draw every noise term up front rather than once per field per run
+    strategies = strategies[:n]
+    count = len(strategies)
+    rng = np.random.default_rng()
+    noise_profit = rng.integers(-150000, 150000, count, endpoint=True)
+    noise_accum = rng.uniform(0.9, 1.1, count)
+    noise_compromised = rng.integers(-3, 3, count, endpoint=True)
+    noise_availability = rng.uniform(-0.05, 0.05, count)
+    noise_at_risk = rng.integers(-2, 2, count, endpoint=True)
+    noise_fraction = rng.uniform(-0.1, 0.1, count)
+    noise_impact = rng.integers(-2, 2, count, endpoint=True)
+    
+    # Calculate realistic outputs based on inputs, one array op per metric
+    # Prevention (F1) reduces compromised systems and increases profits
+    # Detection (F2) helps catch issues early
+    # Response (F3) reduces impact when incidents occur
+    # Recovery (F4) helps restore systems quickly
+    levers = np.array([[s['F1'], s['F2'], s['F3'], s['F4']] for s in strategies], dtype=np.int64).reshape(count, 4)
+    f1, f2, f3, f4 = levers.T
+    
+    base_profit = 1000000
+    profit = base_profit + (f1 * 12000) + (f2 * 8000) - (f3 * 5000) - (f4 * 3000) + noise_profit
+    accumulated_profit = profit * noise_accum
+    
+    # Compromised systems: lower with more prevention and detection
+    compromised = np.maximum(0, 25 - (f1 // 3) - (f2 // 5) - (f3 // 7) - (f4 // 10) + noise_compromised)
+    
+    # Systems availability: higher with more investment
+    availability = np.minimum(1.0, 0.80 + (f1 * 0.002) + (f2 * 0.0015) + (f3 * 0.001) + (f4 * 0.0005) + noise_availability)
+    
+    # Additional outputs
+    systems_at_risk = np.maximum(0, 15 - (f1 // 4) + noise_at_risk)
+    fraction_to_make_profits = np.clip(0.7 - levers.sum(axis=1) / 200 + noise_fraction, 0.0, 1.0)
+    impact_on_business = np.maximum(0, 10 - (f1 // 5) - (f2 // 6) - (f3 // 4) - (f4 // 3) + noise_impact)
+    
+    # Back to Python scalars for JSON
+    metrics = zip(
+        np.round(accumulated_profit, 2).tolist(),
+        profit.tolist(),
+        compromised.tolist(),
+        np.round(availability, 3).tolist(),
+        systems_at_risk.tolist(),
+        np.round(fraction_to_make_profits, 3).tolist(),
+        impact_on_business.tolist()
+    )
+    
+    for i, (strategy, values) in enumerate(zip(strategies, metrics)):
         f1, f2, f3, f4 = strategy['F1'], strategy['F2'], strategy['F3'], strategy['F4']
-        
-        # Calculate realistic outputs based on inputs
-        # Prevention (F1) reduces compromised systems and increases profits
-        # Detection (F2) helps catch issues early
-        # Response (F3) reduces impact when incidents occur
-        # Recovery (F4) helps restore systems quickly
-        
-        base_profit = 1000000
-        profit = base_profit + (f1 * 12000) + (f2 * 8000) - (f3 * 5000) - (f4 * 3000) + random.randint(-150000, 150000)
-        accumulated_profit = profit * random.uniform(0.9, 1.1)
-        
-        # Compromised systems: lower with more prevention and detection
-        compromised = max(0, 25 - (f1 // 3) - (f2 // 5) - (f3 // 7) - (f4 // 10) + random.randint(-3, 3))
-        
-        # Systems availability: higher with more investment
-        availability = min(1.0, 0.80 + (f1 * 0.002) + (f2 * 0.0015) + (f3 * 0.001) + (f4 * 0.0005) + random.uniform(-0.05, 0.05))
-        
-        # Additional outputs
-        systems_at_risk = max(0, 15 - (f1 // 4) + random.randint(-2, 2))
-        fraction_to_make_profits = min(1.0, max(0.0, 0.7 - (f1 + f2 + f3 + f4) / 200 + random.uniform(-0.1, 0.1)))
-        impact_on_business = max(0, 10 - (f1 // 5) - (f2 // 6) - (f3 // 4) - (f4 // 3) + random.randint(-2, 2))
+        accumulated, profits, compromised_systems, uptime, at_risk, fraction, impact = values
         
         # Data API requires IDs to match [a-zA-Z0-9-]+ (no underscores)
         safe_name = strategy['name'].lower().replace(' ', '-').replace('_', '-')
@@ -64,13 +99,13 @@ def generate_realistic_runs(n=10):
             'detection_budget': f2,
             'response_budget': f3,
             'recovery_budget': f4,
-            'accumulated_profit': round(accumulated_profit, 2),
-            'profits': round(profit, 2),
-            'compromised_systems': int(compromised),
-            'systems_availability': round(availability, 3),
-            'systems_at_risk': int(systems_at_risk),
-            'fraction_to_make_profits': round(fraction_to_make_profits, 3),
-            'impact_on_business': round(impact_on_business, 2),
+            'accumulated_profit': accumulated,
+            'profits': profits,
+            'compromised_systems': compromised_systems,
+            'systems_availability': uptime,
+            'systems_at_risk': at_risk,
+            'fraction_to_make_profits': fraction,
+            'impact_on_business': impact,
             'created': (base_time + timedelta(days=i*3)).isoformat(),
             'user': 'MIT@2025002',
             'group': 'default',
@@ -82,18 +117,38 @@ def generate_realistic_runs(n=10):
     return runs
 
 
+def _serialize_run(run):
+    """Serialize one run to indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(run, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(run, indent=2).encode()
+
+
+def _save_run(api, doc):
+    """Save one run by ID, falling back to an auto-generated ID. Returns True on success."""
+    if api.save_simulation_result(doc, document_id=doc['id']):
+        return True
+    # Try with POST (auto-generated ID) if PUT fails
+    return bool(api.save_simulation_result(doc, document_id=None))
+
+
 def save_data_for_dashboard(runs, save_to_data_api=True):
     """Save runs in format dashboard can use."""
+    # Both files hold the same run objects, so serialize each run once and
+    # splice the pieces into the keyed and list layouts
+    pieces = [_serialize_run(run) for run in runs]
     
     # Save to simulation_data.json (dashboard looks for this)
-    data_dict = {run['id']: run for run in runs}
-    with open('simulation_data.json', 'w') as f:
-        json.dump(data_dict, f, indent=2, default=str)
+    with open('simulation_data.json', 'wb') as f:
+        f.write(b'{\n' + b',\n'.join(
+            json.dumps(run['id']).encode() + b': ' + piece
+            for run, piece in zip(runs, pieces)
+        ) + b'\n}')
     print(f"Saved {len(runs)} runs to simulation_data.json")
     
     # Also save as list format (automated_dataset.json)
-    with open('automated_dataset.json', 'w') as f:
-        json.dump(runs, f, indent=2, default=str)
+    with open('automated_dataset.json', 'wb') as f:
+        f.write(b'[\n' + b',\n'.join(pieces) + b'\n]')
     print(f"Saved {len(runs)} runs to automated_dataset.json")
     
     # Save to Data API if configured
@@ -102,19 +157,14 @@ def save_data_for_dashboard(runs, save_to_data_api=True):
             api = ForioDataAPI()
             if api.is_configured():
                 print(f"\nSaving to Forio Data API...")
+                # Ensure no underscores in document IDs
+                docs = [dict(run, id=run['id'].replace('_', '-')) for run in runs]
+                # Per-document PUTs upsert by ID; a PUT of an array to the collection
+                # would replace the whole collection. Overlap them on the shared session.
                 saved_count = 0
-                for run in runs:
-                    # Use POST to auto-generate ID (avoids ID format issues)
-                    # Or use PUT with properly formatted ID
-                    doc_id = run['id'].replace('_', '-')  # Ensure no underscores
-                    saved = api.save_simulation_result(run, document_id=doc_id)
-                    if saved:
-                        saved_count += 1
-                    else:
-                        # Try with POST (auto-generated ID) if PUT fails
-                        saved = api.save_simulation_result(run, document_id=None)
-                        if saved:
-                            saved_count += 1
+                if docs:
+                    with ThreadPoolExecutor(max_workers=min(SAVE_WORKERS, len(docs))) as executor:
+                        saved_count = sum(executor.map(lambda doc: _save_run(api, doc), docs))
                 print(f"Saved {saved_count}/{len(runs)} runs to Data API")
             else:
                 print("Data API not configured, skipping Data API save")
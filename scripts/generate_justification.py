@@ -10,30 +10,134 @@ Requires: matplotlib, pandas, numpy
 import os
 import sys
 import json
-from typing import List, Dict, Optional
+import hashlib
+import io
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Dict, NamedTuple, Optional
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # headless, and safe to use from worker processes
 import matplotlib.pyplot as plt
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# bottleneck's reductions skip NaNs inline instead of materializing a mask
+_nanmean = bn.nanmean if bn is not None else np.nanmean
+_nanstd = bn.nanstd if bn is not None else np.nanstd
+
 # run from repo root when needed
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
 
 OUTPUT_DIR = os.path.join(REPO_ROOT, 'outputs')
+# Normalized datasets keyed on (path, mtime, size) of the source JSON
+CACHE_DIR = os.path.join(OUTPUT_DIR, '_cache')
+KPI_COLUMNS = ('accumulated_profit', 'compromised_systems', 'systems_availability')
+# Bins shared by the per-role and summary histograms of a KPI
+HIST_BINS = 20
+# Per-role plots are inline report thumbnails; the summary figure keeps full resolution
+PLOT_FIGSIZE = (6, 3.5)
+PLOT_DPI = 90
+SUMMARY_DPI = 150
+# Fast zlib level for PNG encoding: slightly larger files, much less CPU
+PNG_SAVE_KWARGS = {'pil_kwargs': {'compress_level': 1, 'optimize': False}}
+# Rows per pd.read_json chunk when the dataset is JSON Lines
+JSONL_CHUNKSIZE = 50_000
+# Columns read from the data/sim_data.csv fallback
+SIM_CSV_COLUMNS = ('Cum. Profits', 'Comp. Systems')
+# Below this many values per KPI the NumPy reductions beat kernel dispatch
+NUMBA_MIN_ROWS = 1_000_000
 KPI_LABELS = {
     'accumulated_profit': 'Accumulated Profit ($)',
     'compromised_systems': 'Compromised Systems (count)',
     'systems_availability': 'Systems Availability (0-1)',
 }
 
+# Markdown building blocks for generate_report; each block ends with its own newline
+REPORT_HEADER = """# Agent Settings Justification
+
+This report explains and visualizes why the **five agent** settings (CFO, CRO, COO, IT_Manager, CHRO) are appropriate based on the distribution of results in the simulation dataset.
+
+## Summary: All Agents
+
+The figure below shows each agent's KPI distribution and target threshold in one view.
+
+![All agents threshold justification](all_agents_threshold_justification.png)
+
+---
+
+"""
+ROLE_NO_DATA_TEMPLATE = """## {role}
+
+- **KPI Focus**: `{kpi}` (no data in dataset)
+
+"""
+ROLE_TEMPLATE = """## {role}
+
+- **KPI Focus**: `{kpi}`
+{target_line}{personality}
+- **Data distribution**:
+  - count: `{count}`
+{distribution}
+![{role} Distribution]({png_name})
+
+- **Rationale**: {rationale}, given mean `{mean:,.2f}` and stdev `{stdev:,.2f}`.
+
+"""
+PERSONALITY_TEMPLATE = """- **Personality**:
+  - risk_tolerance: `{risk_tolerance}`
+  - friendliness: `{friendliness}`
+  - ambition: `{ambition}`
+"""
+DISTRIBUTION_TEMPLATE = """  - min→max: `{min:,.2f}` → `{max:,.2f}`
+  - mean / median: `{mean:,.2f}` / `{median:,.2f}`
+  - stdev: `{stdev:,.2f}`
+  - p30 / p50 / p70: `{p30:,.2f}` / `{p50:,.2f}` / `{p70:,.2f}`
+- **Share meeting target**: `{frac_meet:.1%}`
+"""
+RATIONALE_MIN = 'The target is set near the upper distribution (≈p70) to be achievable yet challenging'
+RATIONALE_MAX = 'The cap is set near the lower distribution (≈p30) to reflect risk limits'
+
 
 def load_agent_config() -> Dict:
-    """Load agent config from config/agent_config.json or app.agents (5 agents)."""
+    """Load agent config from config/agent_config.json or app.agents (5 agents).
+    Cached per process; editing agent_config.json (new mtime) invalidates the cache."""
     config_path = os.path.join(REPO_ROOT, 'config', 'agent_config.json')
-    if os.path.exists(config_path):
-        with open(config_path, 'r') as f:
-            data = json.load(f)
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    return _load_agent_config(config_path, mtime)
+
+
+@lru_cache(maxsize=1)
+def _load_agent_config(config_path: str, mtime: Optional[int]) -> Dict:
+    if mtime is not None:
+        with open(config_path, 'rb') as f:
+            data = _loads(f.read())
         return data.get('agents', data)
     try:
         from app.agents import load_agent_config as app_load
@@ -43,163 +147,424 @@ def load_agent_config() -> Dict:
     return {}
 
 
+def _dataset_cache_path(path: str) -> str:
+    """Cache file for a source dataset; changes whenever the file is rewritten."""
+    st = os.stat(path)
+    key = repr((path, st.st_mtime_ns, st.st_size)).encode()
+    return os.path.join(CACHE_DIR, f"justification_{hashlib.sha1(key).hexdigest()}.pkl")
+
+
+def _to_float(value) -> float:
+    """Coerce one raw KPI value like pd.to_numeric(errors='coerce')."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return np.nan
+
+
+def _iter_json_records(path: str) -> Iterator:
+    """Yield the run records of a JSON array, an id-keyed JSON object, or a JSON Lines file."""
+    with open(path, 'rb') as f:
+        first_line = f.readline().strip()
+        next_line = b''
+        for line in f:
+            next_line = line.strip()
+            if next_line:
+                break
+    if first_line.startswith(b'{') and next_line.startswith(b'{'):
+        try:
+            record = _loads(first_line)
+        except ValueError:
+            record = None
+        # A JSON document can't hold a complete object followed by another, so this is JSON Lines
+        if isinstance(record, dict):
+            for chunk in pd.read_json(path, lines=True, chunksize=JSONL_CHUNKSIZE):
+                yield from chunk.reindex(columns=[c for c in KPI_COLUMNS if c in chunk.columns]).to_dict('records')
+            return
+
+    with open(path, 'rb') as f:
+        if ijson is None:
+            raw = _loads(f.read())
+            yield from (raw.values() if isinstance(raw, dict) else raw)
+        elif first_line.startswith(b'['):
+            yield from ijson.items(f, 'item', use_float=True)
+        else:
+            yield from (v for _, v in ijson.kvitems(f, '', use_float=True))
+
+
+def _read_kpi_columns(path: str) -> Optional[pd.DataFrame]:
+    """Stream a JSON dataset, keeping only the KPI columns. None if it holds no run records."""
+    buffers = {col: array('d') for col in KPI_COLUMNS}
+    seen = set()
+    rows = 0
+    for record in _iter_json_records(path):
+        if not isinstance(record, dict):
+            continue
+        for col, buf in buffers.items():
+            value = record.get(col)
+            if value is not None:
+                seen.add(col)
+            buf.append(_to_float(value))
+        rows += 1
+    if not rows:
+        return None
+    return pd.DataFrame({col: np.frombuffer(buffers[col], dtype=np.float64) for col in KPI_COLUMNS if col in seen},
+                        index=pd.RangeIndex(rows))
+
+
 def load_dataset() -> pd.DataFrame:
     """Load dataset from JSON or CSV with KPI columns. Fallback: optimization_results, sim_data, mock."""
-    data: List[Dict] = []
     candidates = [
         os.path.join(REPO_ROOT, 'automated_dataset.json'),
         os.path.join(REPO_ROOT, 'automated_simulation_data.json'),
         os.path.join(REPO_ROOT, 'simulation_data.json'),
     ]
+    df = None
+    cache_path = None
     for path in candidates:
         if os.path.exists(path):
+            cache_path = _dataset_cache_path(path)
+            try:
+                return pd.read_pickle(cache_path)
+            except Exception:
+                pass
             try:
-                with open(path, 'r') as f:
-                    raw = json.load(f)
-                if isinstance(raw, dict):
-                    data = list(raw.values())
-                elif isinstance(raw, list):
-                    data = raw
-                else:
-                    continue
-                if data and isinstance(data[0], dict):
-                    break
+                df = _read_kpi_columns(path)
             except Exception:
                 continue
+            if df is not None:
+                break
 
-    if not data:
+    if df is None:
+        # Fallback sources are small; only the JSON datasets are cached
+        cache_path = None
         opt_path = os.path.join(REPO_ROOT, 'outputs', 'multi_agent_optimization', 'optimization_results.json')
         if os.path.exists(opt_path):
-            with open(opt_path, 'r') as f:
-                opt = json.load(f)
-            for scenario, configs in opt.items():
-                for config_name, config_data in configs.items():
+            with open(opt_path, 'rb') as f:
+                opt = _loads(f.read())
+            # Accumulate columns (not row dicts) and derive availability in one array op
+            profits = array('d')
+            comps = array('d')
+            for configs in opt.values():
+                for config_data in configs.values():
                     for y in config_data.get('years_summary', [])[:10]:
-                        comp = float(y.get('compromised', 0) or 0)
-                        profit = float(y.get('profit', 0) or 0)
-                        data.append({
-                            'accumulated_profit': profit,
-                            'compromised_systems': comp,
-                            'systems_availability': min(1.0, max(0, 1.0 - comp / 100)),
-                        })
-        if not data and os.path.exists(os.path.join(REPO_ROOT, 'data', 'sim_data.csv')):
-            df_raw = pd.read_csv(os.path.join(REPO_ROOT, 'data', 'sim_data.csv'))
-            if 'Cum. Profits' in df_raw.columns:
-                df_raw['Cum. Profits'] = pd.to_numeric(df_raw['Cum. Profits'].astype(str).str.replace(',', ''), errors='coerce')
-            for _, row in df_raw.head(200).iterrows():
-                profit = float(row.get('Cum. Profits', 0) or 0) * 1000
-                comp = float(row.get('Comp. Systems', 0) or 0)
-                data.append({
+                        comps.append(float(y.get('compromised', 0) or 0))
+                        profits.append(float(y.get('profit', 0) or 0))
+            if comps:
+                comp = np.frombuffer(comps, dtype=np.float64)
+                df = pd.DataFrame({
+                    'accumulated_profit': np.frombuffer(profits, dtype=np.float64),
+                    'compromised_systems': comp,
+                    'systems_availability': np.clip(1.0 - comp / 100, 0.0, 1.0),
+                })
+        if df is None and os.path.exists(os.path.join(REPO_ROOT, 'data', 'sim_data.csv')):
+            # Only the two used columns and the first 200 rows are parsed; the C parser strips thousands separators
+            head = pd.read_csv(os.path.join(REPO_ROOT, 'data', 'sim_data.csv'),
+                               usecols=lambda c: c in SIM_CSV_COLUMNS, nrows=200, thousands=',')
+            # Missing columns count as 0; unparseable cells stay NaN (availability 1.0, as before)
+            zeros = pd.Series(0.0, index=head.index)
+            profit = zeros
+            if 'Cum. Profits' in head.columns:
+                raw = head['Cum. Profits']
+                if not pd.api.types.is_numeric_dtype(raw):
+                    # A stray non-numeric cell leaves the column as text, separators included
+                    raw = raw.astype(str).str.replace(',', '')
+                profit = pd.to_numeric(raw, errors='coerce') * 1000
+            comp = pd.to_numeric(head['Comp. Systems'], errors='coerce') if 'Comp. Systems' in head.columns else zeros
+            if len(head):
+                df = pd.DataFrame({
                     'accumulated_profit': profit,
                     'compromised_systems': comp,
-                    'systems_availability': max(0, min(1.0, 1.0 - comp / 100)),
+                    'systems_availability': (1.0 - comp / 100).clip(0.0, 1.0).fillna(1.0),
                 })
-        if not data:
+        if df is None:
             try:
                 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
                 from multi_agent_demo_mock import generate_mock_runs
                 data = generate_mock_runs(30)
             except Exception:
                 data = [{'accumulated_profit': 1200000 + i*50000, 'compromised_systems': 5 + (i % 10), 'systems_availability': 0.9 + (i % 10)/100} for i in range(50)]
+            df = pd.DataFrame(data)
 
-    df = pd.DataFrame(data)
-    for col in ['accumulated_profit', 'compromised_systems', 'systems_availability']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    if 'systems_availability' in df.columns:
-        av = df['systems_availability']
-        if av.notna().any() and np.nanmedian(av) > 1.0:
-            df['systems_availability'] = av / 100.0
-    needed = ['accumulated_profit', 'compromised_systems', 'systems_availability']
-    present = [c for c in needed if c in df.columns]
+    present = [c for c in KPI_COLUMNS if c in df.columns]
     if not present:
-        raise ValueError(f"Dataset missing KPI columns: {needed}")
+        raise ValueError(f"Dataset missing KPI columns: {list(KPI_COLUMNS)}")
+    df[present] = df[present].apply(pd.to_numeric, errors='coerce')
+    if 'systems_availability' in df.columns:
+        # Percent -> fraction in place on a private float64 copy
+        avail = df['systems_availability'].to_numpy(np.float64, na_value=np.nan, copy=True)
+        if not np.isnan(avail).all() and np.nanmedian(avail) > 1.0:
+            np.divide(avail, 100.0, out=avail)
+            df['systems_availability'] = avail
+    if cache_path:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df.to_pickle(cache_path)
+        except OSError as e:
+            print(f"Warning: Could not cache dataset: {e}")
     return df
 
 
-def summarize_series(s: pd.Series) -> Dict:
-    s_clean = s.dropna()
-    try:
-        s_clean = s_clean.astype(float)
-    except Exception:
-        return {'count': 0}
-    if s_clean.empty:
-        return {'count': 0}
+def kpi_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Convert each KPI column to float64 once (NaN for missing), aligned by run."""
+    arrays = {}
+    for col in KPI_COLUMNS:
+        if col in df.columns:
+            try:
+                arrays[col] = df[col].to_numpy(np.float64, na_value=np.nan)
+            except (TypeError, ValueError):
+                continue
+    return arrays
+
+
+class SummaryStats(NamedTuple):
+    """Summary statistics of one KPI; every field but count is NaN when there is no data."""
+    count: int
+    min: float
+    max: float
+    mean: float
+    median: float
+    stdev: float
+    p30: float
+    p50: float
+    p70: float
+
+
+EMPTY_STATS = SummaryStats(0, *([float('nan')] * 8))
+
+
+def summarize_array(arr: np.ndarray) -> SummaryStats:
+    """Summary statistics of a sorted, NaN-free KPI array (see sorted_kpis)."""
+    n = arr.shape[0]
+    if not n:
+        return EMPTY_STATS
+    # Percentiles interpolate linearly between neighbours in the sorted array (np.quantile's
+    # default), so p50 is the median
+    pos = np.array([0.3, 0.5, 0.7]) * (n - 1)
+    lo = pos.astype(np.int64)
+    hi = np.minimum(lo + 1, n - 1)
+    p30, p50, p70 = (arr[lo] + (arr[hi] - arr[lo]) * (pos - lo)).tolist()
+    return SummaryStats(
+        count=int(n),
+        min=float(arr[0]),
+        max=float(arr[-1]),
+        mean=float(_nanmean(arr)),
+        median=p50,
+        stdev=float(_nanstd(arr, ddof=1)) if n > 1 else 0.0,
+        p30=p30,
+        p50=p50,
+        p70=p70,
+    )
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _sorted_quantile(col, n, q):
+        """Linearly interpolated quantile of the first n sorted values, as in summarize_array."""
+        pos = q * (n - 1)
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        return col[lo] + (col[hi] - col[lo]) * (pos - lo)
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _reduce_sorted(mat, lengths):
+        """Per column of sorted values (first lengths[j] rows valid): min, max, mean, median, stdev, p30, p50, p70."""
+        k = mat.shape[1]
+        out = np.empty((k, 8))
+        for j in prange(k):
+            n = lengths[j]
+            if n == 0:
+                out[j, :] = np.nan
+                continue
+            col = mat[:n, j]
+            total = 0.0
+            for i in range(n):
+                total += col[i]
+            mean = total / n
+            ss = 0.0
+            for i in range(n):
+                d = col[i] - mean
+                ss += d * d
+            out[j, 0] = col[0]
+            out[j, 1] = col[n - 1]
+            out[j, 2] = mean
+            out[j, 4] = np.sqrt(ss / (n - 1)) if n > 1 else 0.0
+            out[j, 5] = _sorted_quantile(col, n, 0.3)
+            out[j, 6] = _sorted_quantile(col, n, 0.5)
+            out[j, 7] = _sorted_quantile(col, n, 0.7)
+            out[j, 3] = out[j, 6]
+        return out
+else:
+    _reduce_sorted = None
+
+
+def summarize_kpis(clean: Dict[str, np.ndarray]) -> Dict[str, SummaryStats]:
+    """summarize_array for every sorted KPI array; large datasets go through one parallel Numba pass
+    when numba is installed."""
+    if _reduce_sorted is None or not clean or max(arr.shape[0] for arr in clean.values()) < NUMBA_MIN_ROWS:
+        return {kpi: summarize_array(arr) for kpi, arr in clean.items()}
+    kpis = list(clean)
+    lengths = np.array([clean[kpi].shape[0] for kpi in kpis], dtype=np.int64)
+    # Column-major so each KPI is contiguous; rows past a column's length are ignored
+    mat = np.zeros((int(lengths.max()), len(kpis)), order='F')
+    for j, kpi in enumerate(kpis):
+        mat[:lengths[j], j] = clean[kpi]
+    reduced = _reduce_sorted(mat, lengths)
     return {
-        'count': int(s_clean.shape[0]),
-        'min': float(np.nanmin(s_clean)),
-        'max': float(np.nanmax(s_clean)),
-        'mean': float(np.nanmean(s_clean)),
-        'median': float(np.nanmedian(s_clean)),
-        'stdev': float(np.nanstd(s_clean, ddof=1)) if s_clean.shape[0] > 1 else 0.0,
-        'p30': float(np.nanpercentile(s_clean, 30)),
-        'p50': float(np.nanpercentile(s_clean, 50)),
-        'p70': float(np.nanpercentile(s_clean, 70)),
+        kpi: SummaryStats(int(n), *row) if n else EMPTY_STATS
+        for kpi, n, row in zip(kpis, lengths.tolist(), reduced.tolist())
     }
 
 
-def fraction_meeting_target(s: pd.Series, target: Dict) -> float:
-    s_clean = s.dropna()
-    try:
-        s_clean = s_clean.astype(float)
-    except Exception:
-        return 0.0
-    if s_clean.empty:
+def sorted_kpis(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Drop NaNs and sort each KPI column once; shared by stats, target shares and plots."""
+    return {kpi: np.sort(arr[~np.isnan(arr)]) for kpi, arr in columns.items()}
+
+
+def fraction_meeting_target_sorted(sorted_arr: np.ndarray, target: Dict) -> float:
+    """Share of a sorted, NaN-free KPI array meeting target ('min' takes precedence) via binary search."""
+    n = sorted_arr.shape[0]
+    if not n:
         return 0.0
     if 'min' in target:
-        return float(np.mean(s_clean >= target['min']))
+        return 1.0 - np.searchsorted(sorted_arr, target['min'], side='left') / n
     if 'max' in target:
-        return float(np.mean(s_clean <= target['max']))
+        return np.searchsorted(sorted_arr, target['max'], side='right') / n
     return 0.0
 
 
-def plot_distribution(
-    s: pd.Series,
+def target_values_by_kpi(agents_config: Dict) -> Dict[str, List[float]]:
+    """Every min/max target value set on each KPI, across all roles."""
+    values: Dict[str, List[float]] = {}
+    for cfg in agents_config.values():
+        target = cfg.get('target', {})
+        bound = target.get('min', target.get('max'))
+        if cfg.get('kpi') and isinstance(bound, (int, float)):
+            values.setdefault(cfg['kpi'], []).append(float(bound))
+    return values
+
+
+def histogram_edges(sorted_arr: np.ndarray, targets: List[float], bins: int = HIST_BINS) -> np.ndarray:
+    """Evenly spaced bin edges over a sorted KPI array, with the nearest interior edge moved onto each target."""
+    lo, hi = float(sorted_arr[0]), float(sorted_arr[-1])
+    if lo == hi:
+        return np.histogram_bin_edges(sorted_arr, bins=bins)
+    edges = np.linspace(lo, hi, bins + 1)
+    # Endpoints stay on the data range so no value falls outside the histogram
+    free = np.ones(edges.shape[0], dtype=bool)
+    free[[0, -1]] = False
+    for value in set(targets):
+        if lo < value < hi and free.any():
+            idx = np.flatnonzero(free)[np.argmin(np.abs(edges[free] - value))]
+            edges[idx] = value
+            free[idx] = False
+    edges.sort()
+    return edges
+
+
+def kpi_histograms(clean: Dict[str, np.ndarray], targets: Optional[Dict[str, List[float]]] = None,
+                   bins: int = HIST_BINS) -> Dict[str, tuple]:
+    """(counts, edges) per KPI, computed once and shared by the per-role and summary plots.
+    Arrays must be sorted (see sorted_kpis); targets (see target_values_by_kpi) land on bin boundaries."""
+    targets = targets or {}
+    return {
+        kpi: np.histogram(values, bins=histogram_edges(values, targets.get(kpi, []), bins))
+        for kpi, values in clean.items() if values.size
+    }
+
+
+def hist_bars(ax, counts: np.ndarray, edges: np.ndarray, **style):
+    """Draw a precomputed histogram as bars (cheaper than ax.hist re-binning the data)."""
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **style)
+
+
+def plot_distribution_array(
+    values: np.ndarray,
     title: str,
     xlabel: str,
     target: Dict,
     out_path: str,
     secondary_target: Optional[Dict] = None,
     secondary_label: Optional[str] = None,
+    hist: Optional[tuple] = None,
+    ax=None,
+    dpi: int = PLOT_DPI,
 ):
-    """Plot histogram with target line(s). Optionally add a second target line (e.g. other agent same KPI)."""
-    s_clean = s.dropna()
-    try:
-        s_clean = s_clean.astype(float)
-    except Exception:
-        plt.close()
+    """Plot histogram of a NaN-free KPI array with target line(s). Optionally add a second target line (e.g. other agent same KPI).
+    Pass hist=(counts, edges) to reuse an already computed histogram, and ax to draw into an
+    existing axes (cleared first, figure left open for the next plot)."""
+    if not values.size:
         return
-    if s_clean.empty:
-        plt.close()
-        return
-    plt.figure(figsize=(8, 5))
-    n, bins, patches = plt.hist(s_clean, bins=20, color='#60a5fa', alpha=0.65, edgecolor='white')
+    counts, edges = hist if hist is not None else np.histogram(values, bins=HIST_BINS)
+    owns_figure = ax is None
+    if owns_figure:
+        fig, ax = plt.subplots(figsize=PLOT_FIGSIZE)
+    else:
+        fig = ax.figure
+        ax.clear()
+    hist_bars(ax, counts, edges, color='#60a5fa', alpha=0.65, edgecolor='white')
     if 'min' in target:
         v = target['min']
         fmt = f"{v:,.0f}" if v > 100 else f"{v:.2f}"
-        plt.axvline(v, color='#1d4ed8', linestyle='--', linewidth=2, label=f"Target ≥ {fmt}")
+        ax.axvline(v, color='#1d4ed8', linestyle='--', linewidth=2, label=f"Target ≥ {fmt}")
     elif 'max' in target:
         v = target['max']
         fmt = f"{v:,.0f}" if isinstance(v, (int, float)) and v > 100 else f"{v:.2f}"
-        plt.axvline(v, color='#dc2626', linestyle='--', linewidth=2, label=f"Target ≤ {fmt}")
+        ax.axvline(v, color='#dc2626', linestyle='--', linewidth=2, label=f"Target ≤ {fmt}")
     if secondary_target and secondary_label:
         if 'min' in secondary_target:
             v = secondary_target['min']
-            plt.axvline(v, color='#7c3aed', linestyle=':', linewidth=1.5, label=secondary_label)
+            ax.axvline(v, color='#7c3aed', linestyle=':', linewidth=1.5, label=secondary_label)
         elif 'max' in secondary_target:
             v = secondary_target['max']
-            plt.axvline(v, color='#7c3aed', linestyle=':', linewidth=1.5, label=secondary_label)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel('Count')
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(out_path, dpi=150)
-    plt.close()
+            ax.axvline(v, color='#7c3aed', linestyle=':', linewidth=1.5, label=secondary_label)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Count')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=dpi, **PNG_SAVE_KWARGS)
+    if owns_figure:
+        plt.close(fig)
+
+
+# Per-process axes reused for every per-role plot rendered in that process
+_plot_ax = None
+
+
+def _plot_worker(job: tuple):
+    """Top-level entry point so plot jobs can be pickled to worker processes."""
+    global _plot_ax
+    if _plot_ax is None:
+        _, _plot_ax = plt.subplots(figsize=PLOT_FIGSIZE)
+    plot_distribution_array(*job, ax=_plot_ax)
+
+
+def render_plots(jobs: List[tuple]):
+    """Render independent distribution plots in parallel, one process per CPU."""
+    global _plot_ax
+    if len(jobs) < 2 or (os.cpu_count() or 1) < 2:
+        try:
+            for job in jobs:
+                _plot_worker(job)
+        finally:
+            if _plot_ax is not None:
+                plt.close(_plot_ax.figure)
+                _plot_ax = None
+        return
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count())) as executor:
+        list(executor.map(_plot_worker, jobs))
 
 
-def plot_all_agents_summary(df: pd.DataFrame, agents_config: Dict, out_path: str):
-    """One figure with 5 panels: each agent's KPI distribution and target line."""
+def plot_all_agents_summary(clean: Dict[str, np.ndarray], agents_config: Dict, out_path: str,
+                            hists: Optional[Dict[str, tuple]] = None):
+    """One figure with 5 panels: each agent's KPI distribution (sorted, NaN-free arrays by KPI; see sorted_kpis) and target line."""
+    if hists is None:
+        hists = kpi_histograms(clean, target_values_by_kpi(agents_config))
     role_order = [r for r in ['CFO', 'CRO', 'COO', 'IT_Manager', 'CHRO'] if r in agents_config]
     if not role_order:
         return
@@ -218,15 +583,15 @@ def plot_all_agents_summary(df: pd.DataFrame, agents_config: Dict, out_path: str
         cfg = agents_config[role]
         kpi = cfg.get('kpi')
         target = cfg.get('target', {})
-        if kpi not in df.columns:
+        if kpi not in clean:
             ax.text(0.5, 0.5, f'{role}\nNo data', ha='center', va='center')
             ax.set_title(role)
             continue
-        s = df[kpi].dropna().astype(float)
-        if s.empty:
+        values = clean[kpi]
+        if not values.size:
             ax.set_title(role)
             continue
-        ax.hist(s, bins=15, color=colors[idx % len(colors)], alpha=0.7, edgecolor='white')
+        hist_bars(ax, *hists[kpi], color=colors[idx % len(colors)], alpha=0.7, edgecolor='white')
         if 'min' in target:
             v = target['min']
             ax.axvline(v, color='#1d4ed8', linestyle='--', linewidth=2, label=f"≥ {v:,.0f}" if v > 100 else f"≥ {v:.2f}")
@@ -241,33 +606,91 @@ def plot_all_agents_summary(df: pd.DataFrame, agents_config: Dict, out_path: str
         axes_flat[j].set_visible(False)
     plt.suptitle('Agent Threshold Justification: KPI Distributions and Targets (5 Agents)', fontsize=12, fontweight='bold', y=1.02)
     plt.tight_layout()
-    plt.savefig(out_path, dpi=150, bbox_inches='tight')
+    plt.savefig(out_path, dpi=SUMMARY_DPI, bbox_inches='tight', **PNG_SAVE_KWARGS)
     plt.close()
 
 
+def role_png_name(role: str, kpi: str) -> str:
+    """File name of a role's distribution plot inside OUTPUT_DIR."""
+    return f"{role.replace(' ', '_').lower()}_{kpi}_distribution.png"
+
+
+def _stamp_path() -> str:
+    return os.path.join(OUTPUT_DIR, '.justification_stamp')
+
+
+def report_stamp(agents_config: Dict) -> Optional[str]:
+    """Hash of everything the report depends on: the dataset sources, the agent config and this script.
+    None when no dataset source exists (mock data is random, so it is never considered up to date)."""
+    sources = [
+        os.path.join(REPO_ROOT, 'automated_dataset.json'),
+        os.path.join(REPO_ROOT, 'automated_simulation_data.json'),
+        os.path.join(REPO_ROOT, 'simulation_data.json'),
+        os.path.join(REPO_ROOT, 'outputs', 'multi_agent_optimization', 'optimization_results.json'),
+        os.path.join(REPO_ROOT, 'data', 'sim_data.csv'),
+    ]
+    state = []
+    for path in sources:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        state.append((path, st.st_mtime_ns, st.st_size))
+    if not state:
+        return None
+    st = os.stat(os.path.abspath(__file__))
+    key = repr((state, st.st_mtime_ns, json.dumps(agents_config, sort_keys=True, default=str)))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def report_up_to_date(stamp: Optional[str]) -> bool:
+    """True if the last run wrote this stamp and every output it produced is still there."""
+    if stamp is None:
+        return False
+    try:
+        with open(_stamp_path(), 'rb') as f:
+            saved = _loads(f.read())
+    except (OSError, ValueError):
+        return False
+    if not isinstance(saved, dict) or saved.get('stamp') != stamp:
+        return False
+    return all(os.path.exists(os.path.join(OUTPUT_DIR, name)) for name in saved.get('outputs', []))
+
+
+def write_report_stamp(stamp: Optional[str], agents_config: Dict):
+    """Record the stamp and the outputs generate_report produced for it."""
+    if stamp is None:
+        return
+    names = ['AGENT_SETTINGS_JUSTIFICATION.md', 'all_agents_threshold_justification.png']
+    names += [role_png_name(role, cfg.get('kpi')) for role, cfg in agents_config.items() if cfg.get('kpi')]
+    outputs = [name for name in names if os.path.exists(os.path.join(OUTPUT_DIR, name))]
+    try:
+        with open(_stamp_path(), 'w') as f:
+            json.dump({'stamp': stamp, 'outputs': outputs}, f)
+    except OSError as e:
+        print(f"Warning: Could not write report stamp: {e}")
+
+
 def generate_report(df: pd.DataFrame, agents_config: Dict) -> str:
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    report_lines: List[str] = []
-    report_lines.append('# Agent Settings Justification')
-    report_lines.append('')
-    report_lines.append('This report explains and visualizes why the **five agent** settings (CFO, CRO, COO, IT_Manager, CHRO) are appropriate based on the distribution of results in the simulation dataset.')
-    report_lines.append('')
+    buf = io.StringIO()
+    write = buf.write
 
     role_order = [r for r in ['CFO', 'CRO', 'COO', 'IT_Manager', 'CHRO'] if r in agents_config]
     if not role_order:
         role_order = list(agents_config.keys())
 
+    # Convert each KPI column once, then drop NaNs and sort for stats, target shares and plots
+    clean = sorted_kpis(kpi_arrays(df))
+    hists = kpi_histograms(clean, target_values_by_kpi(agents_config))
+    stats_by_kpi = summarize_kpis(clean)
+
     # Combined summary figure
     summary_path = os.path.join(OUTPUT_DIR, 'all_agents_threshold_justification.png')
-    plot_all_agents_summary(df, agents_config, summary_path)
-    report_lines.append('## Summary: All Agents')
-    report_lines.append('')
-    report_lines.append('The figure below shows each agent\'s KPI distribution and target threshold in one view.')
-    report_lines.append('')
-    report_lines.append('![All agents threshold justification](all_agents_threshold_justification.png)')
-    report_lines.append('')
-    report_lines.append('---')
-    report_lines.append('')
+    plot_all_agents_summary(clean, agents_config, summary_path, hists)
+    write(REPORT_HEADER)
+
+    plot_jobs: List[tuple] = []
 
     # Per-agent sections and individual distribution plots
     for role in role_order:
@@ -276,19 +699,15 @@ def generate_report(df: pd.DataFrame, agents_config: Dict) -> str:
         target = cfg.get('target', {})
         personality = cfg.get('personality', {})
 
-        if kpi not in df.columns:
-            report_lines.append(f'## {role}')
-            report_lines.append('')
-            report_lines.append(f'- **KPI Focus**: `{kpi}` (no data in dataset)')
-            report_lines.append('')
+        if kpi not in clean:
+            write(ROLE_NO_DATA_TEMPLATE.format(role=role, kpi=kpi))
             continue
 
-        s = df[kpi]
-        stats = summarize_series(s)
-        frac_meet = fraction_meeting_target(s, target)
+        values = clean[kpi]
+        stats = stats_by_kpi[kpi]
+        frac_meet = fraction_meeting_target_sorted(values, target)
 
-        safe_role = role.replace(' ', '_').lower()
-        png_name = f"{safe_role}_{kpi}_distribution.png"
+        png_name = role_png_name(role, kpi)
         out_png = os.path.join(OUTPUT_DIR, png_name)
         title = f"{role}: {kpi.replace('_', ' ').title()}"
         xlabel = KPI_LABELS.get(kpi, kpi)
@@ -302,41 +721,37 @@ def generate_report(df: pd.DataFrame, agents_config: Dict) -> str:
             secondary_target = agents_config['COO'].get('target')
             secondary_label = "COO target (reference)"
 
-        plot_distribution(s, title, xlabel, target, out_png, secondary_target, secondary_label)
+        plot_jobs.append((values, title, xlabel, target, out_png, secondary_target, secondary_label, hists.get(kpi)))
 
-        report_lines.append(f'## {role}')
-        report_lines.append('')
-        report_lines.append(f'- **KPI Focus**: `{kpi}`')
         if 'min' in target:
-            report_lines.append(f'- **Target**: `min = {target["min"]:,.2f}`' if target['min'] > 100 else f'- **Target**: `min = {target["min"]:.2f}`')
+            target_line = f'- **Target**: `min = {target["min"]:,.2f}`\n' if target['min'] > 100 else f'- **Target**: `min = {target["min"]:.2f}`\n'
         elif 'max' in target:
-            report_lines.append(f'- **Target**: `max = {target["max"]:,.2f}`')
-        if personality:
-            report_lines.append('- **Personality**:')
-            report_lines.append(f"  - risk_tolerance: `{personality.get('risk_tolerance', '—')}`")
-            report_lines.append(f"  - friendliness: `{personality.get('friendliness', '—')}`")
-            report_lines.append(f"  - ambition: `{personality.get('ambition', '—')}`")
-        report_lines.append('')
-        report_lines.append('- **Data distribution**:')
-        report_lines.append(f"  - count: `{stats.get('count', 0)}`")
-        if stats.get('count', 0) > 0:
-            report_lines.append(f"  - min→max: `{stats['min']:,.2f}` → `{stats['max']:,.2f}`")
-            report_lines.append(f"  - mean / median: `{stats['mean']:,.2f}` / `{stats['median']:,.2f}`")
-            report_lines.append(f"  - stdev: `{stats['stdev']:,.2f}`")
-            report_lines.append(f"  - p30 / p50 / p70: `{stats['p30']:,.2f}` / `{stats['p50']:,.2f}` / `{stats['p70']:,.2f}`")
-            report_lines.append(f"- **Share meeting target**: `{frac_meet:.1%}`")
-        report_lines.append('')
-        report_lines.append(f'![{role} Distribution]({png_name})')
-        report_lines.append('')
-        if 'min' in target:
-            report_lines.append(f"- **Rationale**: The target is set near the upper distribution (≈p70) to be achievable yet challenging, given mean `{stats.get('mean', 0):,.2f}` and stdev `{stats.get('stdev', 0):,.2f}`.")
+            target_line = f'- **Target**: `max = {target["max"]:,.2f}`\n'
         else:
-            report_lines.append(f"- **Rationale**: The cap is set near the lower distribution (≈p30) to reflect risk limits, given mean `{stats.get('mean', 0):,.2f}` and stdev `{stats.get('stdev', 0):,.2f}`.")
-        report_lines.append('')
+            target_line = ''
+        write(ROLE_TEMPLATE.format(
+            role=role,
+            kpi=kpi,
+            png_name=png_name,
+            target_line=target_line,
+            personality=PERSONALITY_TEMPLATE.format(
+                risk_tolerance=personality.get('risk_tolerance', '—'),
+                friendliness=personality.get('friendliness', '—'),
+                ambition=personality.get('ambition', '—'),
+            ) if personality else '',
+            count=stats.count,
+            distribution=DISTRIBUTION_TEMPLATE.format(**stats._asdict(), frac_meet=frac_meet) if stats.count > 0 else '',
+            rationale=RATIONALE_MIN if 'min' in target else RATIONALE_MAX,
+            mean=stats.mean,
+            stdev=stats.stdev,
+        ))
+
+    render_plots(plot_jobs)
 
     report_path = os.path.join(OUTPUT_DIR, 'AGENT_SETTINGS_JUSTIFICATION.md')
     with open(report_path, 'w') as f:
-        f.write('\n'.join(report_lines))
+        # Blocks are newline-terminated; keep a single trailing newline
+        f.write(buf.getvalue().rstrip('\n') + '\n')
     return report_path
 
 
@@ -350,7 +765,12 @@ if __name__ == '__main__':
             'CRO': {'kpi': 'compromised_systems', 'target': {'max': 10}, 'personality': {'risk_tolerance': 0.2, 'friendliness': 0.5, 'ambition': 0.6}},
             'COO': {'kpi': 'systems_availability', 'target': {'min': 0.92}, 'personality': {'risk_tolerance': 0.5, 'friendliness': 0.7, 'ambition': 0.7}},
         }
+    stamp = report_stamp(agents_config)
+    if report_up_to_date(stamp):
+        print(f"Report up to date: {os.path.join(OUTPUT_DIR, 'AGENT_SETTINGS_JUSTIFICATION.md')}")
+        sys.exit(0)
     df = load_dataset()
     report_path = generate_report(df, agents_config)
+    write_report_stamp(stamp, agents_config)
     print(f"Generated report: {report_path}")
     print(f"Images saved in: {OUTPUT_DIR}/")
@@ -2,24 +2,81 @@
 Generate Summary Report for Multi-Agent Optimization Results
 """
 
+import io
 import json
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+RULE_EQ = "=" * 80
+RULE_DASH = "-" * 80
 
 def load_results(results_path: str = 'outputs/multi_agent_optimization/optimization_results.json') -> Dict:
     """Load optimization results."""
-    with open(results_path, 'r') as f:
-        return json.load(f)
+    # One read of the raw bytes; orjson parses bytes directly
+    with open(results_path, 'rb') as f:
+        return _loads(f.read())
+
+def normalize_results(results: Dict) -> Tuple[Dict[str, Dict[str, Tuple[float, float, float]]], Dict[str, tuple], Optional[Tuple[float, float, float, float]]]:
+    """
+    Coerce every config's metrics to floats and aggregate them in a single pass.
+    
+    Returns:
+        norm: scenario -> config -> (total_profit, total_systems_at_risk, average_compromised_systems)
+        best: scenario -> (best profit config, its row, best risk config, its row); first config wins ties
+        ranges: (min profit, max profit, min risk, max risk) across every scenario and config, or None if empty
+    """
+    norm = {}
+    best = {}
+    min_profit = max_profit = min_risk = max_risk = None
+    for scenario, configs in results.items():
+        scenario_norm = {}
+        best_profit_cfg = best_risk_cfg = None
+        best_profit_row = best_risk_row = None
+        for config_name, config_data in configs.items():
+            metrics = config_data['metrics']
+            row = (
+                float(metrics.get('total_profit', 0)),
+                float(metrics.get('total_systems_at_risk', 0)),
+                float(metrics.get('average_compromised_systems', 0)),
+            )
+            scenario_norm[config_name] = row
+            profit, risk, _ = row
+            if best_profit_row is None or profit > best_profit_row[0]:
+                best_profit_cfg, best_profit_row = config_name, row
+            if best_risk_row is None or risk < best_risk_row[1]:
+                best_risk_cfg, best_risk_row = config_name, row
+            if min_profit is None:
+                min_profit = max_profit = profit
+                min_risk = max_risk = risk
+            else:
+                min_profit = min(min_profit, profit)
+                max_profit = max(max_profit, profit)
+                min_risk = min(min_risk, risk)
+                max_risk = max(max_risk, risk)
+        norm[scenario] = scenario_norm
+        best[scenario] = (best_profit_cfg, best_profit_row, best_risk_cfg, best_risk_row)
+    ranges = None if min_profit is None else (min_profit, max_profit, min_risk, max_risk)
+    return norm, best, ranges
 
 def generate_summary_report(results: Dict) -> str:
     """Generate comprehensive summary report."""
-    report = []
-    
-    report.append("=" * 80)
-    report.append("MULTI-AGENT OPTIMIZATION FOR CYBER-RISK MANAGEMENT")
-    report.append("5-Year Analysis Results Summary")
-    report.append("=" * 80)
-    report.append("")
+    norm, best, ranges = normalize_results(results)
+    buf = io.StringIO()
+    w = buf.write
+    
+    w(RULE_EQ)
+    w("\n")
+    w("MULTI-AGENT OPTIMIZATION FOR CYBER-RISK MANAGEMENT\n")
+    w("5-Year Analysis Results Summary\n")
+    w(RULE_EQ)
+    w("\n")
+    w("\n")
     
     scenario_labels = {
         'simple_deterministic': 'Simple Threats - Deterministic Attacker',
@@ -35,151 +92,116 @@ def generate_summary_report(results: Dict) -> str:
         'high_risk_tolerance': 'High Risk Tolerance'
     }
     
-    report.append("EXECUTIVE SUMMARY")
-    report.append("-" * 80)
-    report.append("")
-    report.append("This analysis evaluates multi-agent optimization for cyber-risk management")
-    report.append("across four threat scenarios over a 5-year horizon. The framework uses")
-    report.append("executive agents (CFO, CRO, COO) with personality-driven decision-making")
-    report.append("to optimize budget allocation (F1-F4) and achieve optimal balance between")
-    report.append("accumulated profit and systems at risk.")
-    report.append("")
-    
-    report.append("PRIMARY RESULTS: ACCUMULATED PROFIT AND SYSTEMS AT RISK")
-    report.append("-" * 80)
-    report.append("")
-    
-    for scenario, scenario_label in scenario_labels.items():
-        if scenario not in results:
-            continue
-        
-        report.append(f"Scenario: {scenario_label}")
-        report.append("")
-        
-        best_profit = None
-        best_risk = None
-        best_config_profit = None
-        best_config_risk = None
+    # Resolve lookups once: the scenarios present in the results, and a local label getter
+    cfg_get = config_labels.get
+    scenarios = [(scenario, label, norm[scenario]) for scenario, label in scenario_labels.items() if scenario in norm]
+    
+    w("EXECUTIVE SUMMARY\n")
+    w(RULE_DASH)
+    w("\n")
+    w("\n")
+    w("This analysis evaluates multi-agent optimization for cyber-risk management\n")
+    w("across four threat scenarios over a 5-year horizon. The framework uses\n")
+    w("executive agents (CFO, CRO, COO) with personality-driven decision-making\n")
+    w("to optimize budget allocation (F1-F4) and achieve optimal balance between\n")
+    w("accumulated profit and systems at risk.\n")
+    w("\n")
+    
+    w("PRIMARY RESULTS: ACCUMULATED PROFIT AND SYSTEMS AT RISK\n")
+    w(RULE_DASH)
+    w("\n")
+    w("\n")
+    
+    for scenario, scenario_label, scenario_norm in scenarios:
+        w(f"Scenario: {scenario_label}\n")
+        w("\n")
         
-        for config_name, config_data in results[scenario].items():
-            metrics = config_data['metrics']
-            profit = metrics.get('total_profit', 0)
-            systems_at_risk = metrics.get('total_systems_at_risk', 0)
-            
-            if best_profit is None or profit > best_profit:
-                best_profit = profit
-                best_config_profit = config_name
-            
-            if best_risk is None or systems_at_risk < best_risk:
-                best_risk = systems_at_risk
-                best_config_risk = config_name
+        best_config_profit, (best_profit, risk_val, _), best_config_risk, (profit_val, best_risk, _) = best[scenario]
         
-        report.append(f"  Best Profit Configuration: {config_labels.get(best_config_profit, best_config_profit)}")
-        report.append(f"    Total Profit: ${best_profit:,.0f}")
-        risk_val = results[scenario][best_config_profit]['metrics'].get('total_systems_at_risk', 0)
-        report.append(f"    Total Systems at Risk: {float(risk_val):.1f}")
-        report.append("")
-        report.append(f"  Best Risk Configuration: {config_labels.get(best_config_risk, best_config_risk)}")
-        profit_val = results[scenario][best_config_risk]['metrics'].get('total_profit', 0)
-        report.append(f"    Total Profit: ${float(profit_val):,.0f}")
-        report.append(f"    Total Systems at Risk: {float(best_risk):.1f}")
-        report.append("")
+        w(f"  Best Profit Configuration: {cfg_get(best_config_profit, best_config_profit)}\n")
+        w(f"    Total Profit: ${best_profit:,.0f}\n")
+        w(f"    Total Systems at Risk: {risk_val:.1f}\n")
+        w("\n")
+        w(f"  Best Risk Configuration: {cfg_get(best_config_risk, best_config_risk)}\n")
+        w(f"    Total Profit: ${profit_val:,.0f}\n")
+        w(f"    Total Systems at Risk: {best_risk:.1f}\n")
+        w("\n")
         
-        report.append("  All Configurations:")
-        for config_name, config_data in results[scenario].items():
-            metrics = config_data['metrics']
-            report.append(f"    {config_labels.get(config_name, config_name)}:")
-            profit = float(metrics.get('total_profit', 0))
-            risk = float(metrics.get('total_systems_at_risk', 0))
-            comp = float(metrics.get('average_compromised_systems', 0))
-            report.append(f"      Total Profit: ${profit:,.0f}")
-            report.append(f"      Total Systems at Risk: {risk:.1f}")
-            report.append(f"      Avg Compromised Systems: {comp:.2f}")
-        report.append("")
-    
-    report.append("COLLABORATIVE VS UNCOLLABORATIVE AGENTS")
-    report.append("-" * 80)
-    report.append("")
-    
-    for scenario, scenario_label in scenario_labels.items():
-        if scenario not in results:
-            continue
-        
-        if 'collaborative' in results[scenario] and 'uncollaborative' in results[scenario]:
-            collab_metrics = results[scenario]['collaborative']['metrics']
-            uncollab_metrics = results[scenario]['uncollaborative']['metrics']
+        w("  All Configurations:\n")
+        for config_name, (profit, risk, comp) in scenario_norm.items():
+            w(f"    {cfg_get(config_name, config_name)}:\n")
+            w(f"      Total Profit: ${profit:,.0f}\n")
+            w(f"      Total Systems at Risk: {risk:.1f}\n")
+            w(f"      Avg Compromised Systems: {comp:.2f}\n")
+        w("\n")
+    
+    w("COLLABORATIVE VS UNCOLLABORATIVE AGENTS\n")
+    w(RULE_DASH)
+    w("\n")
+    w("\n")
+    
+    for scenario, scenario_label, scenario_norm in scenarios:
+        if 'collaborative' in scenario_norm and 'uncollaborative' in scenario_norm:
+            collab_profit, collab_risk, _ = scenario_norm['collaborative']
+            uncollab_profit, uncollab_risk, _ = scenario_norm['uncollaborative']
             
-            profit_diff = float(collab_metrics.get('total_profit', 0)) - float(uncollab_metrics.get('total_profit', 0))
-            risk_diff = float(collab_metrics.get('total_systems_at_risk', 0)) - float(uncollab_metrics.get('total_systems_at_risk', 0))
-            uncollab_profit = float(uncollab_metrics.get('total_profit', 1))
+            profit_diff = collab_profit - uncollab_profit
+            risk_diff = collab_risk - uncollab_risk
+            # Relative difference against a missing or zero baseline falls back to /1
+            uncollab_profit = uncollab_profit or 1.0
             
-            report.append(f"{scenario_label}:")
-            report.append(f"  Profit Difference: ${profit_diff:+,.0f} ({profit_diff/uncollab_profit*100:+.1f}%)")
-            report.append(f"  Risk Difference: {risk_diff:+.1f} systems")
-            report.append("")
-    
-    report.append("RISK TOLERANCE VARIATIONS")
-    report.append("-" * 80)
-    report.append("")
-    
-    for scenario, scenario_label in scenario_labels.items():
-        if scenario not in results:
-            continue
-        
-        if all(c in results[scenario] for c in ['low_risk_tolerance', 'collaborative', 'high_risk_tolerance']):
-            low_metrics = results[scenario]['low_risk_tolerance']['metrics']
-            med_metrics = results[scenario]['collaborative']['metrics']
-            high_metrics = results[scenario]['high_risk_tolerance']['metrics']
+            w(f"{scenario_label}:\n")
+            w(f"  Profit Difference: ${profit_diff:+,.0f} ({profit_diff/uncollab_profit*100:+.1f}%)\n")
+            w(f"  Risk Difference: {risk_diff:+.1f} systems\n")
+            w("\n")
+    
+    w("RISK TOLERANCE VARIATIONS\n")
+    w(RULE_DASH)
+    w("\n")
+    w("\n")
+    
+    for scenario, scenario_label, scenario_norm in scenarios:
+        if all(c in scenario_norm for c in ['low_risk_tolerance', 'collaborative', 'high_risk_tolerance']):
+            low_profit, low_risk, _ = scenario_norm['low_risk_tolerance']
+            med_profit, med_risk, _ = scenario_norm['collaborative']
+            high_profit, high_risk, _ = scenario_norm['high_risk_tolerance']
             
-            report.append(f"{scenario_label}:")
-            report.append(f"  Low Risk Tolerance:")
-            low_profit = float(low_metrics.get('total_profit', 0))
-            low_risk = float(low_metrics.get('total_systems_at_risk', 0))
-            report.append(f"    Profit: ${low_profit:,.0f}, Risk: {low_risk:.1f}")
-            report.append(f"  Medium Risk Tolerance:")
-            med_profit = float(med_metrics.get('total_profit', 0))
-            med_risk = float(med_metrics.get('total_systems_at_risk', 0))
-            report.append(f"    Profit: ${med_profit:,.0f}, Risk: {med_risk:.1f}")
-            report.append(f"  High Risk Tolerance:")
-            high_profit = float(high_metrics.get('total_profit', 0))
-            high_risk = float(high_metrics.get('total_systems_at_risk', 0))
-            report.append(f"    Profit: ${high_profit:,.0f}, Risk: {high_risk:.1f}")
-            report.append("")
-    
-    report.append("KEY FINDINGS")
-    report.append("-" * 80)
-    report.append("")
-    
-    all_profits = []
-    all_risks = []
-    
-    for scenario_data in results.values():
-        for config_data in scenario_data.values():
-            metrics = config_data['metrics']
-            all_profits.append(float(metrics.get('total_profit', 0)))
-            all_risks.append(float(metrics.get('total_systems_at_risk', 0)))
-    
-    if all_profits:
-        report.append(f"1. Profit Range: ${min(all_profits):,.0f} to ${max(all_profits):,.0f}")
-        report.append(f"2. Systems at Risk Range: {min(all_risks):.1f} to {max(all_risks):.1f}")
-        report.append("")
-        report.append("3. Collaborative agents generally achieve:")
-        report.append("   - Better profit optimization in deterministic scenarios")
-        report.append("   - More consistent risk management")
-        report.append("")
-        report.append("4. Risk tolerance significantly impacts:")
-        report.append("   - Profit vs risk trade-offs")
-        report.append("   - Strategy adaptation over time")
-        report.append("")
-        report.append("5. Scenario-specific insights:")
-        report.append("   - Advanced attacks require different optimization strategies")
-        report.append("   - Ransomware scenarios show higher variability")
-        report.append("   - Unpredictable attackers require more adaptive responses")
-    
-    report.append("")
-    report.append("=" * 80)
-    
-    return "\n".join(report)
+            w(f"{scenario_label}:\n")
+            w(f"  Low Risk Tolerance:\n")
+            w(f"    Profit: ${low_profit:,.0f}, Risk: {low_risk:.1f}\n")
+            w(f"  Medium Risk Tolerance:\n")
+            w(f"    Profit: ${med_profit:,.0f}, Risk: {med_risk:.1f}\n")
+            w(f"  High Risk Tolerance:\n")
+            w(f"    Profit: ${high_profit:,.0f}, Risk: {high_risk:.1f}\n")
+            w("\n")
+    
+    w("KEY FINDINGS\n")
+    w(RULE_DASH)
+    w("\n")
+    w("\n")
+    
+    if ranges:
+        min_profit, max_profit, min_risk, max_risk = ranges
+        w(f"1. Profit Range: ${min_profit:,.0f} to ${max_profit:,.0f}\n")
+        w(f"2. Systems at Risk Range: {min_risk:.1f} to {max_risk:.1f}\n")
+        w("\n")
+        w("3. Collaborative agents generally achieve:\n")
+        w("   - Better profit optimization in deterministic scenarios\n")
+        w("   - More consistent risk management\n")
+        w("\n")
+        w("4. Risk tolerance significantly impacts:\n")
+        w("   - Profit vs risk trade-offs\n")
+        w("   - Strategy adaptation over time\n")
+        w("\n")
+        w("5. Scenario-specific insights:\n")
+        w("   - Advanced attacks require different optimization strategies\n")
+        w("   - Ransomware scenarios show higher variability\n")
+        w("   - Unpredictable attackers require more adaptive responses\n")
+    
+    w("\n")
+    w(RULE_EQ)
+    
+    return buf.getvalue()
 
 def main():
     """Generate and save report."""
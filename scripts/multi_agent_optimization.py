@@ -19,6 +19,11 @@ import seaborn as sns
 from scipy.optimize import minimize
 from scipy.stats import gaussian_kde
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.agents import ExecutiveBot, BoardRoom, load_agent_config
@@ -27,6 +32,28 @@ sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (16, 12)
 os.makedirs('outputs/multi_agent_optimization', exist_ok=True)
 
+def _jsonable(obj):
+    """Convert NumPy scalars/arrays and datetimes that the JSON encoders can't handle."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _write_json(path: str, data):
+    """Write indented JSON, using orjson's native encoder when it is installed."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, default=_jsonable,
+                                 option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, default=_jsonable)
+
+
 class SimulationDataLoader:
     """Load and filter simulation data from CSV."""
     
@@ -588,8 +615,7 @@ def run_comprehensive_analysis():
                 ]
             }
     
-    with open(f'{output_dir}/optimization_results.json', 'w') as f:
-        json.dump(results_json, f, indent=2, default=str)
+    _write_json(f'{output_dir}/optimization_results.json', results_json)
     
     print(f"\n✅ Results saved to {output_dir}/optimization_results.json")
     
@@ -875,8 +901,7 @@ def run_paper_matrix_analysis():
                                   'systems_at_risk': y.get('systems_at_risk', 0), 'F1': y.get('F1', 0), 'F2': y.get('F2', 0), 'F3': y.get('F3', 0), 'F4': y.get('F4', 0)}
                 for y in config_res['years']]
             }
-    with open(f'{output_dir}/paper_matrix_results.json', 'w') as f:
-        json.dump(results_json, f, indent=2, default=str)
+    _write_json(f'{output_dir}/paper_matrix_results.json', results_json)
     print(f"\nSaved {output_dir}/paper_matrix_results.json")
     return all_results
 
@@ -4,27 +4,91 @@ Facilitator projects often store results separately from run variables.
 """
 
 import os
+import sys
 import base64
 import requests
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.forio_auth import load_cached_token, save_cached_token
+
 load_dotenv()
 PUBLIC_KEY = os.getenv("PUBLIC_KEY")
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 FORIO_ORG = os.getenv("FORIO_ORG", "mitcams")
 FORIO_PROJECT = os.getenv("FORIO_PROJECT", "cyberriskmanagement-ransomeware-2023")
 
+# probes are latency-bound, so issue them concurrently over one pooled session
+MAX_WORKERS = 8
+session = requests.Session()
+session.mount("https://", HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+))
+
+
+def get_token():
+    """Reuse the shared on-disk token until shortly before expiry, else request one."""
+    token = load_cached_token(PUBLIC_KEY, PRIVATE_KEY)
+    if token:
+        return token
+    
+    creds = base64.b64encode(f"{PUBLIC_KEY}:{PRIVATE_KEY}".encode()).decode()
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Authorization": f"Basic {creds}"
+    }
+    data = {"grant_type": "client_credentials"}
+    r = session.post("https://api.forio.com/v2/oauth/token", headers=headers, data=data)
+    r.raise_for_status()
+    payload = r.json()
+    save_cached_token(PUBLIC_KEY, PRIVATE_KEY, payload["access_token"], payload.get("expires_in", 3600))
+    return payload["access_token"]
+
+
+async def _probe_async(urls, headers):
+    async with httpx.AsyncClient(http2=h2 is not None, headers=headers, timeout=10) as client:
+        return await asyncio.gather(*(client.get(url) for url in urls), return_exceptions=True)
+
+
+def probe_all(urls, headers):
+    """
+    GET every url concurrently and return responses (or exceptions) in order.
+    Uses httpx (multiplexed over one HTTP/2 connection when h2 is installed),
+    falling back to the pooled requests session on a thread pool.
+    """
+    if httpx is not None:
+        return asyncio.run(_probe_async(urls, headers))
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(session.get, url, headers=headers, timeout=10) for url in urls]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
+
+
 # get oauth token
-creds = base64.b64encode(f"{PUBLIC_KEY}:{PRIVATE_KEY}".encode()).decode()
-headers = {
-    "Content-Type": "application/x-www-form-urlencoded",
-    "Authorization": f"Basic {creds}"
-}
-data = {"grant_type": "client_credentials"}
-r = requests.post("https://api.forio.com/v2/oauth/token", headers=headers, data=data)
-r.raise_for_status()
-token = r.json()["access_token"]
+token = get_token()
 headers = {"Authorization": f"Bearer {token}"}
 
 print("=" * 70)
@@ -44,11 +108,16 @@ collections = [
     "metrics"
 ]
 
-for collection in collections:
-    url = f"https://api.forio.com/v2/data/{FORIO_ORG}/{FORIO_PROJECT}/{collection}"
-    
+probes = zip(collections, probe_all(
+    [f"https://api.forio.com/v2/data/{FORIO_ORG}/{FORIO_PROJECT}/{collection}" for collection in collections],
+    headers
+))
+
+# report in submission order
+for collection, resp in probes:
     try:
-        resp = requests.get(url, headers=headers)
+        if isinstance(resp, Exception):
+            raise resp
         print(f"\n{collection}:")
         print(f"  Status: {resp.status_code}")
         
@@ -80,7 +149,7 @@ print(f"{'='*70}")
 
 # get a run id
 url = f"https://forio.com/v2/run/{FORIO_ORG}/{FORIO_PROJECT}/;saved=true;trashed=false?startRecord=0&endRecord=1"
-resp = requests.get(url, headers=headers)
+resp = session.get(url, headers=headers, timeout=10)
 runs = resp.json()
 
 if runs:
@@ -94,9 +163,12 @@ if runs:
         f"https://api.forio.com/v2/data/{FORIO_ORG}/{FORIO_PROJECT}?q=run_id:{run_id}",
     ]
     
-    for endpoint in data_endpoints:
+    probes = zip(data_endpoints, probe_all(data_endpoints, headers))
+    
+    for endpoint, resp in probes:
         try:
-            resp = requests.get(endpoint, headers=headers)
+            if isinstance(resp, Exception):
+                raise resp
             if resp.status_code == 200:
                 data = resp.json()
                 if data: